@@ -2,13 +2,17 @@
 Simple Flask web app for exploring data analysis results
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context
 import pandas as pd
+import pyarrow.parquet as pq
 import json
 import os
-from datetime import datetime
-import subprocess
+from datetime import date, datetime
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import importlib
 import sys
+import time
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 
@@ -17,28 +21,133 @@ DATA_DIR = 'data'
 RESULTS_DIR = 'results'
 VIZ_DIR = 'notebooks/visualizations'
 
+# Analysis stages (file names start with digits, so import them by name)
+data_cleaning = importlib.import_module('src.01_data_cleaning')
+exploratory = importlib.import_module('src.02_exploratory_analysis')
+statistical = importlib.import_module('src.03_statistical_analysis')
+
+# How long browsers may cache chart images (seconds) - charts only change on re-run
+VIZ_MAX_AGE = 86400
+
+# Max seconds for each analysis stage
+ANALYSIS_TIMEOUT = 300
+
+# How long a file status check stays valid (seconds)
+STATUS_TTL = 1.0
+_status_cache = {'checked_at': None, 'status': None}
+
+# Chart file names, keyed by the folder's mtime (adding/removing files changes it)
+_viz_cache = {}
+
 # Helper functions
 
+def list_viz():
+    """Sorted chart file names - one stat of the folder unless its contents changed"""
+    try:
+        mtime = os.stat(VIZ_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if mtime in _viz_cache:
+        return _viz_cache[mtime]
+    
+    with os.scandir(VIZ_DIR) as entries:
+        files = sorted(e.name for e in entries if e.name.endswith('.png') and e.is_file())
+    _viz_cache.clear()
+    _viz_cache[mtime] = files
+    return files
+
 def check_if_data_exists():
-    """Check what analysis files we have"""
-    return {
+    """Check what analysis files we have (re-checked at most once per STATUS_TTL)"""
+    now = time.monotonic()
+    if _status_cache['checked_at'] is not None and now - _status_cache['checked_at'] < STATUS_TTL:
+        return _status_cache['status']
+    
+    status = {
         'raw_data': os.path.exists(os.path.join(DATA_DIR, 'OnlineRetail.csv')),
-        'cleaned_data': os.path.exists(os.path.join(RESULTS_DIR, 'cleaned_data.csv')),
-        'visualizations': os.path.exists(VIZ_DIR) and len(os.listdir(VIZ_DIR)) > 0
+        'cleaned_data': os.path.exists(os.path.join(RESULTS_DIR, 'cleaned_data.parquet')),
+        'visualizations': len(list_viz()) > 0
+    }
+    _status_cache['checked_at'] = now
+    _status_cache['status'] = status
+    return status
+
+def count_csv_rows(filepath):
+    """Count data rows by scanning newlines in 1 MB blocks (no CSV parsing)"""
+    lines = 0
+    last = b''
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last and last != b'\n':
+        lines += 1  # last line has no newline at the end
+    return max(lines - 1, 0)  # minus the header
+
+def format_preview_dates(df):
+    """Turn date columns into the text a CSV would hold (jsonify sends RFC-1123 dates otherwise),
+    so the preview doesn't change with the storage format"""
+    for col in df.select_dtypes('datetime').columns:
+        values = df[col].dropna()
+        # like to_csv: just the date when every time in the column is midnight
+        date_only = (values == values.dt.normalize()).all()
+        df[col] = df[col].dt.strftime('%Y-%m-%d' if date_only else '%Y-%m-%d %H:%M:%S')
+    for col in df.select_dtypes(include='object', exclude='str').columns:
+        # parquet date32 columns come back as datetime.date objects - str() gives 2010-12-01
+        if df[col].map(lambda v: isinstance(v, date)).any():
+            df[col] = df[col].map(lambda v: str(v) if isinstance(v, date) else v)
+    return df
+
+@lru_cache(maxsize=8)
+def _cached_preview(filepath, rows, mtime):
+    """Read the preview once per file version - mtime is part of the key so edits miss the cache"""
+    if filepath.endswith('.parquet'):
+        # parquet keeps the row count in its metadata, and we only decode the first batch
+        parquet_file = pq.ParquetFile(filepath)
+        df = format_preview_dates(next(parquet_file.iter_batches(batch_size=rows)).to_pandas())
+        total_rows = parquet_file.metadata.num_rows
+    else:
+        df = pd.read_csv(filepath, nrows=rows)  # only parse the rows we show
+        total_rows = count_csv_rows(filepath)
+    return {
+        'rows': total_rows,
+        'columns': df.columns.tolist(),
+        'preview': df.values.tolist()
     }
 
 def load_data_preview(filepath, rows=5):
     """Load first few rows of CSV"""
     try:
-        df = pd.read_csv(filepath)
-        return {
-            'rows': len(df),
-            'columns': df.columns.tolist(),
-            'preview': df.head(rows).values.tolist()
-        }
+        return _cached_preview(filepath, rows, os.path.getmtime(filepath))
     except Exception as e:
         return {'error': str(e)}
 
+def clear_caches():
+    """Forget cached previews/status after the analysis rewrites the files"""
+    _cached_preview.cache_clear()
+    _status_cache['checked_at'] = None
+
+def stream_csv(filepath, chunksize=10_000):
+    """Yield a CSV (or parquet converted to CSV) in chunks so big files never sit in memory all at once"""
+    if filepath.endswith('.parquet'):
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(filepath).iter_batches(batch_size=chunksize))
+    else:
+        chunks = pd.read_csv(filepath, chunksize=chunksize)
+    
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header)
+        header = False
+
+def csv_download(filepath, download_name):
+    """Stream a CSV file back as an attachment"""
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f'{download_name} not found')
+    return Response(
+        stream_with_context(stream_csv(filepath)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={download_name}'}
+    )
+
 # Routes
 
 @app.route('/')
@@ -51,18 +160,20 @@ def home():
 def dashboard():
     """Dashboard - view all results and visualizations"""
     status = check_if_data_exists()
-    
-    # get list of chart images
-    viz_files = []
-    if os.path.exists(VIZ_DIR):
-        viz_files = [f for f in os.listdir(VIZ_DIR) if f.endswith('.png')]
-    
-    return render_template('dashboard.html', status=status, viz_files=sorted(viz_files))
+    viz_files = list_viz()  # chart images, already sorted
+    return render_template('dashboard.html', status=status, viz_files=viz_files)
 
 @app.route('/viz/<filename>')
 def get_viz(filename):
-    """Serve visualization images"""
-    return send_file(os.path.join(VIZ_DIR, filename), mimetype='image/png')
+    """Serve visualization images (with ETag/Last-Modified so repeat loads get a 304)"""
+    response = send_from_directory(
+        os.path.abspath(VIZ_DIR), filename,
+        mimetype='image/png',
+        max_age=VIZ_MAX_AGE,
+        conditional=True
+    )
+    response.headers['Cache-Control'] = f'public, max-age={VIZ_MAX_AGE}'
+    return response
 
 @app.route('/api/status')
 def api_status():
@@ -80,66 +191,87 @@ def api_data_preview():
 @app.route('/api/cleaned-data')
 def api_cleaned_data():
     """Preview cleaned data"""
-    filepath = os.path.join(RESULTS_DIR, 'cleaned_data.csv')
+    filepath = os.path.join(RESULTS_DIR, 'cleaned_data.parquet')
     if os.path.exists(filepath):
         return jsonify(load_data_preview(filepath, rows=10))
     return jsonify({'error': 'Cleaned data not found'})
 
+def _quiet_worker():
+    """Worker initializer - the stages print a lot of progress, send it to /dev/null"""
+    sys.stdout = open(os.devnull, 'w')
+
+def _run_stage(stage_main, **kwargs):
+    """Run one stage's main() in a worker; return nothing so no DataFrame gets pickled back"""
+    stage_main(**kwargs)
+
+def _wait_for(job, stage):
+    """Wait for a stage - returns an error response if it failed, None if it worked"""
+    try:
+        job.result(timeout=ANALYSIS_TIMEOUT)
+    except TimeoutError:
+        return jsonify({'error': 'Analysis took too long (timeout)'}), 400
+    except Exception as e:
+        return jsonify({'error': f'{stage} failed: {e}'}), 400
+    return None
+
+def _stop_pool(pool, jobs):
+    """Shut the stage pool down - if a stage is still running (timeout/failure), kill its worker
+    so it can't keep writing outputs or overlap with the next run"""
+    if any(not job.done() for job in jobs):
+        if hasattr(pool, 'terminate_workers'):  # Python 3.14+
+            pool.terminate_workers()
+            return
+        workers = list((pool._processes or {}).values())
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join(timeout=5)  # reap them so nothing is left behind
+    pool.shutdown(wait=False, cancel_futures=True)
+
 @app.route('/api/run-analysis', methods=['POST'])
 def api_run_analysis():
-    """Run analysis scripts and return status"""
+    """Run analysis stages and return status"""
+    # Stages run in worker processes with stdout discarded (failures still come back
+    # as exceptions). Cleaning goes first; the exploratory and statistical stages are
+    # independent, so they run side by side
+    pool = ProcessPoolExecutor(max_workers=2, initializer=_quiet_worker)
+    jobs = []
     try:
-        # Run data cleaning
-        result = subprocess.run(
-            [sys.executable, 'src/01_data_cleaning.py'],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        if result.returncode != 0:
-            return jsonify({'error': f'Cleaning failed: {result.stderr}'}), 400
-        
-        # Run exploratory analysis
-        result = subprocess.run(
-            [sys.executable, 'src/02_exploratory_analysis.py'],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        if result.returncode != 0:
-            return jsonify({'error': f'Analysis failed: {result.stderr}'}), 400
+        jobs.append(pool.submit(_run_stage, data_cleaning.main))
+        error = _wait_for(jobs[0], 'Cleaning')
+        if error:
+            return error
         
-        # Run statistical analysis
-        result = subprocess.run(
-            [sys.executable, 'src/03_statistical_analysis.py'],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        if result.returncode != 0:
-            return jsonify({'error': f'Stats failed: {result.stderr}'}), 400
+        eda_job = pool.submit(_run_stage, exploratory.main, verbose=False)  # output is discarded anyway
+        stats_job = pool.submit(_run_stage, statistical.main)
+        jobs += [eda_job, stats_job]
+        for job, stage in ((eda_job, 'Analysis'), (stats_job, 'Stats')):
+            error = _wait_for(job, stage)
+            if error:
+                return error
         
+        clear_caches()
         return jsonify({
             'success': True,
             'message': 'Analysis complete',
             'timestamp': datetime.now().isoformat()
         })
     
-    except subprocess.TimeoutExpired:
-        return jsonify({'error': 'Analysis took too long (timeout)'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        _stop_pool(pool, jobs)
 
 @app.route('/download/<filetype>')
 def download(filetype):
     """Download CSV results"""
     try:
         if filetype == 'cleaned':
-            filepath = os.path.join(RESULTS_DIR, 'cleaned_data.csv')
-            return send_file(filepath, as_attachment=True, download_name='cleaned_data.csv')
+            filepath = os.path.join(RESULTS_DIR, 'cleaned_data.parquet')
+            return csv_download(filepath, 'cleaned_data.csv')
         elif filetype == 'report':
             filepath = os.path.join(RESULTS_DIR, 'cleaning_report.csv')
-            return send_file(filepath, as_attachment=True, download_name='cleaning_report.csv')
+            return csv_download(filepath, 'cleaning_report.csv')
         return jsonify({'error': 'Unknown file type'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -165,6 +297,10 @@ if __name__ == '__main__':
     print("\nFlask app starting...")
     print("Open http://localhost:5000 in your browser\n")
     
-    app.run(debug=True, host='localhost', port=5000)
-    if __name__ == "__main__":
-        app.run()
+    if os.getenv('FLASK_DEV'):
+        # debug server with auto-reload - handy while editing, but single-threaded
+        app.run(debug=True, host='localhost', port=5000)
+    else:
+        # waitress handles requests on several threads (the caches above are shared by all)
+        from waitress import serve
+        serve(app, host='localhost', port=5000, threads=8)
@@ -3,8 +3,10 @@ End-to-end data analysis script
 Loads data, cleans it, runs exploratory analysis, and generates visualizations
 """
 
+import csv
 import pandas as pd
 import numpy as np
+import pyarrow.csv as pv
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
@@ -18,6 +20,28 @@ sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 5)
 plt.rcParams['font.size'] = 10
 
+# Column types for the raw CSV (parsed straight into Arrow types)
+RAW_COLUMN_TYPES = {
+    'InvoiceNo': 'string',
+    'StockCode': 'string',
+    'Description': 'string',
+    'Quantity': 'int32',
+    'InvoiceDate': 'string',
+    'UnitPrice': 'float64',  # money stays float64 - float32 can't hold the pence exactly
+    'CustomerID': 'string',
+    'Country': 'string',
+}
+
+
+def top_share_sum(values, fraction):
+    """Sum of the largest `fraction` of values - np.partition is O(n), no full sort needed"""
+    values = np.asarray(values)
+    k = int(fraction * len(values))
+    if k == 0:
+        return 0.0
+    return np.partition(values, -k)[-k:].sum()
+
+
 print(f"\nAnalysis started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
 # ====================
@@ -26,7 +50,11 @@ print(f"\nAnalysis started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
 
 print("Loading data...")
 try:
-    df = pd.read_csv('data/OnlineRetail.csv')
+    table = pv.read_csv('data/OnlineRetail.csv', convert_options=pv.ConvertOptions(
+        column_types=RAW_COLUMN_TYPES,
+        strings_can_be_null=True  # empty CustomerID should be missing, not ''
+    ))
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
     print(f"✓ Loaded {len(df):,} rows, {len(df.columns)} columns")
 except FileNotFoundError:
     print("✗ Error: OnlineRetail.csv not found in data/ folder")
@@ -48,8 +76,7 @@ for col in df.columns:
 print("\n\nCleaning data...")
 
 # Remove missing values
-df = df[df['CustomerID'].notna()]
-df = df[df['InvoiceNo'].notna()]
+df = df[df[['CustomerID', 'InvoiceNo']].notna().all(axis=1)]  # one mask, one copy
 print(f"✓ Removed rows with missing customer/invoice ID")
 
 # Remove duplicates
@@ -58,11 +85,10 @@ df = df.drop_duplicates()
 print(f"✓ Removed {initial - len(df):,} duplicate rows")
 
 # Fix data types
-df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'], format='%m/%d/%Y %H:%M', errors='coerce')
-df['UnitPrice'] = pd.to_numeric(df['UnitPrice'], errors='coerce')
-df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce')
-df['CustomerID'] = df['CustomerID'].astype(str).str.strip()
-df['Country'] = df['Country'].astype('category')
+df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'], format='%m/%d/%Y %H:%M', cache=True, errors='coerce')
+# small ints for Quantity; UnitPrice stays float64 so TotalSales below keeps its pence
+df['UnitPrice'] = df['UnitPrice'].astype('float64')
+df['Quantity'] = pd.to_numeric(df['Quantity'], errors='coerce', downcast='integer')
 print(f"✓ Fixed data types")
 
 # Create derived columns
@@ -74,10 +100,16 @@ df['Quarter'] = df['InvoiceDate'].dt.quarter
 print(f"✓ Created derived columns")
 
 # Filter data for analysis (remove returns)
-df_sales = df[(df['Quantity'] > 0) & (df['UnitPrice'] > 0)].copy()
-df_returns = df[df['Quantity'] < 0].copy()
+# no .copy() needed - pandas 3 is always copy-on-write, and these are only read from
+df_sales = df[(df['Quantity'] > 0) & (df['UnitPrice'] > 0)]
+df_returns = df[df['Quantity'] < 0]
 print(f"✓ Filtered: {len(df_sales):,} sales, {len(df_returns):,} returns")
 
+# ID columns as categories so the groupbys below hash integer codes, not strings
+# (every groupby on them passes observed=True to skip unseen categories)
+for col in ('CustomerID', 'StockCode', 'InvoiceNo'):
+    df_sales[col] = df_sales[col].astype('category')
+
 print(f"\nFinal dataset: {len(df_sales):,} rows ready for analysis")
 
 # ====================
@@ -86,12 +118,28 @@ print(f"\nFinal dataset: {len(df_sales):,} rows ready for analysis")
 
 print("\n\nExploring data...")
 
+# Aggregates - each computed once here and reused by every section below
+revenue_stats = df_sales['TotalSales'].agg(['sum', 'mean'])
+total_revenue = revenue_stats['sum']
+avg_order = revenue_stats['mean']
+
+# sort=False: nothing below needs the groups in key order
+customer_sales = df_sales.groupby('CustomerID', sort=False, observed=True).agg({
+    'TotalSales': 'sum',
+    'InvoiceNo': 'nunique',
+    'Quantity': 'sum'
+}).rename(columns={'InvoiceNo': 'NumTransactions', 'Quantity': 'NumItems'})
+product_sales = df_sales.groupby('StockCode', sort=False, observed=True)['TotalSales'].sum()
+
+# separate groupings on purpose - a combined Country x Month grouping would drop rows
+# with a missing date from the country totals (and rows with no country from the months)
+country_sales = df_sales.groupby('Country', observed=True)['TotalSales'].sum().sort_values(ascending=False)
+monthly_sales = df_sales.groupby('Month')['TotalSales'].sum()
+
 # Basic metrics
-total_revenue = df_sales['TotalSales'].sum()
-num_customers = df_sales['CustomerID'].nunique()
-num_products = df_sales['StockCode'].nunique()
-num_countries = df_sales['Country'].nunique()
-avg_order = df_sales['TotalSales'].mean()
+num_customers = len(customer_sales)
+num_products = len(product_sales)
+num_countries = len(country_sales)
 
 print(f"\nMetrics:")
 print(f"  Total revenue: £{total_revenue:,.0f}")
@@ -101,25 +149,17 @@ print(f"  Countries: {num_countries}")
 print(f"  Average order value: £{avg_order:.2f}")
 
 # Customer analysis
-customer_sales = df_sales.groupby('CustomerID').agg({
-    'TotalSales': 'sum',
-    'InvoiceNo': 'nunique',
-    'Quantity': 'sum'
-}).rename(columns={'InvoiceNo': 'NumTransactions', 'Quantity': 'NumItems'})
-
 print(f"\nCustomer behavior:")
 repeat_pct = (customer_sales['NumTransactions'] > 1).sum() / len(customer_sales) * 100
 print(f"  Repeat customers: {repeat_pct:.1f}%")
 print(f"  One-time customers: {100-repeat_pct:.1f}%")
 
 # Revenue concentration
-customer_sales_sorted = customer_sales.sort_values('TotalSales', ascending=False)
-top20_revenue = customer_sales_sorted.head(int(0.2*len(customer_sales)))['TotalSales'].sum()
+top20_revenue = top_share_sum(customer_sales['TotalSales'].to_numpy(), 0.2)
 concentration = top20_revenue / total_revenue * 100
 print(f"  Top 20% of customers: {concentration:.0f}% of revenue")
 
 # Geography
-country_sales = df_sales.groupby('Country')['TotalSales'].sum().sort_values(ascending=False)
 top_country = country_sales.iloc[0]
 top_country_pct = top_country / total_revenue * 100
 print(f"\nGeography:")
@@ -130,16 +170,15 @@ for i, (country, revenue) in enumerate(country_sales.head(5).items(), 1):
     print(f"    {i}. {country}: {pct:.0f}%")
 
 # Seasonality
-monthly_sales = df_sales.groupby('Month')['TotalSales'].sum()
 print(f"\nSeasonality (by month):")
+avg_monthly_sales = monthly_sales.mean()
 for month, sales in monthly_sales.items():
-    pct = sales / monthly_sales.mean() * 100
+    pct = sales / avg_monthly_sales * 100
     print(f"  Month {month:2d}: £{sales:>10,.0f} ({pct:>3.0f}% of average)")
 
 # Product analysis
-product_sales = df_sales.groupby('StockCode')['TotalSales'].sum().sort_values(ascending=False)
-top20_products = product_sales.head(int(0.2*len(product_sales)))
-product_concentration = top20_products.sum() / total_revenue * 100
+top20_products_revenue = top_share_sum(product_sales.to_numpy(), 0.2)
+product_concentration = top20_products_revenue / total_revenue * 100
 print(f"\nProducts:")
 print(f"  Top 20% of products: {product_concentration:.0f}% of revenue")
 
@@ -150,20 +189,29 @@ print(f"  Top 20% of products: {product_concentration:.0f}% of revenue")
 print("\n\nStatistical analysis...")
 
 # Correlation analysis
-numeric_cols = df_sales[['Quantity', 'UnitPrice', 'TotalSales']].select_dtypes(include=[np.number])
+corr_matrix = df_sales[['Quantity', 'UnitPrice', 'TotalSales']].corr(numeric_only=True)  # one pass for all pairs
 print(f"\nCorrelations:")
-for col1 in numeric_cols.columns:
-    for col2 in numeric_cols.columns:
+# same pairs and labels as before - each pair once, names in alphabetical order
+for col1 in corr_matrix.columns:
+    for col2 in corr_matrix.columns:
         if col1 < col2:
-            corr = df_sales[col1].corr(df_sales[col2])
-            print(f"  {col1} vs {col2}: {corr:.3f}")
+            print(f"  {col1} vs {col2}: {corr_matrix.loc[col1, col2]:.3f}")
 
 # Price sensitivity (avg price vs quantity sold)
-price_quartiles = pd.qcut(df_sales['UnitPrice'], q=4, duplicates='drop')
-price_qty = df_sales.groupby(price_quartiles)['Quantity'].mean()
+# quartile edges via np.quantile (no full sort), then bin + average with plain numpy
+prices = df_sales['UnitPrice'].to_numpy(dtype=np.float64)
+quantities = df_sales['Quantity'].to_numpy(dtype=np.float64)
+price_edges = np.unique(np.quantile(prices, [0.25, 0.5, 0.75]))  # unique = drop duplicate edges
+price_bins = np.digitize(prices, price_edges, right=True)  # right=True -> (low, high] bins
+qty_per_bin = np.bincount(price_bins, weights=quantities, minlength=len(price_edges) + 1)
+rows_per_bin = np.bincount(price_bins, minlength=len(price_edges) + 1)
+bin_bounds = np.concatenate(([prices.min()], price_edges, [prices.max()]))
 print(f"\nPrice vs Quantity (lower price = more units?):")
-for price_range, qty in price_qty.items():
-    print(f"  {price_range}: avg {qty:.0f} units")
+for i, rows in enumerate(rows_per_bin):
+    if rows == 0:
+        continue
+    opening = '[' if i == 0 else '('
+    print(f"  {opening}{bin_bounds[i]:.2f}, {bin_bounds[i + 1]:.2f}]: avg {qty_per_bin[i] / rows:.0f} units")
 
 print("\n✓ Analysis complete!")
 print(f"Finished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -176,8 +224,8 @@ print("Saving outputs...")
 
 # Save cleaned data
 os.makedirs('results', exist_ok=True)
-df_sales.to_csv('results/cleaned_data.csv', index=False)
-print(f"✓ Saved: results/cleaned_data.csv")
+df_sales.to_parquet('results/cleaned_data.parquet', engine='pyarrow', compression='zstd', index=False)
+print(f"✓ Saved: results/cleaned_data.parquet")
 
 # Save summary statistics
 summary = {
@@ -192,8 +240,10 @@ summary = {
     'Top Country Market Share': f"{top_country_pct:.0f}%",
 }
 
-summary_df = pd.DataFrame(list(summary.items()), columns=['Metric', 'Value'])
-summary_df.to_csv('results/summary.csv', index=False)
+with open('results/summary.csv', 'w', newline='') as f:
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(['Metric', 'Value'])
+    writer.writerows(summary.items())
 print(f"✓ Saved: results/summary.csv")
 
 print(f"\nDone! Check results/ folder for outputs.")
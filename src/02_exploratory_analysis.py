@@ -8,34 +8,272 @@ Focus on business-relevant insights.
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # files only, no GUI backend needed
 import matplotlib.pyplot as plt
+import pyarrow.parquet as pq
 import seaborn as sns
 from datetime import datetime
+from functools import cached_property
 import logging
+import os
+import sys
+
+try:
+    from src.analysis_pool import run_analyses  # imported as src.NN_... (app, tests)
+except ModuleNotFoundError:
+    from analysis_pool import run_analyses  # run as a script: python src/NN_....py
 
 # Setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
+# constrained layout sizes things up front, so saving doesn't need a tight-bbox probe render
+plt.rcParams['figure.constrained_layout.use'] = True
+
+MAX_SCATTER_POINTS = 5000  # more than this is just an unreadable blob that takes ages to draw
+
+# Columns the aggregates need - all that a streamed read keeps
+STREAM_COLUMNS = ['InvoiceNo', 'Description', 'Quantity', 'InvoiceDate', 'UnitPrice',
+                  'CustomerID', 'Country', 'TotalSales']
+
+
+def load_cleaned_data(data_path):
+    """Load the cleaned data - parquet when possible (typed, compressed, much quicker than CSV)"""
+    if data_path.endswith('.parquet'):
+        return pd.read_parquet(data_path)
+    
+    # a CSV gets a parquet copy next to it; reuse that copy until the CSV changes
+    parquet_path = os.path.splitext(data_path)[0] + '.parquet'
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(data_path):
+        return pd.read_parquet(parquet_path)
+    
+    df = pd.read_csv(data_path, engine='pyarrow', parse_dates=['InvoiceDate'])
+    df.to_parquet(parquet_path, compression='zstd', index=False)
+    return df
+
+
+def iter_chunks(data_path, chunksize):
+    """Read the cleaned data a chunk at a time - parquet batches or CSV chunks"""
+    if data_path.endswith('.parquet'):
+        for batch in pq.ParquetFile(data_path).iter_batches(batch_size=chunksize, columns=STREAM_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(data_path, chunksize=chunksize, usecols=STREAM_COLUMNS,
+                               parse_dates=['InvoiceDate'], dtype={'CustomerID': str, 'InvoiceNo': str})
+
+
+def hist_bars(ax, counts, edges, **kwargs):
+    """Draw a histogram from precomputed np.histogram output"""
+    return ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **kwargs)
 
 
 class ExploratoryDataAnalysis:
-    def __init__(self, data_path):
-        """Load cleaned data"""
-        self.df = pd.read_csv(data_path)
-        self.df['InvoiceDate'] = pd.to_datetime(self.df['InvoiceDate'])
+    def __init__(self, data_path, df=None, verbose=True):
+        """Load cleaned data (or use a DataFrame that's already loaded)"""
+        self.verbose = verbose
+        # shallow copy of a passed-in frame - with copy-on-write the casts below never touch the caller's data
+        self.df = load_cleaned_data(data_path) if df is None else df.copy(deep=False)
+        self.df['InvoiceDate'] = pd.to_datetime(self.df['InvoiceDate'])  # no-op when already parsed
+        
+        # repeated text/IDs as category - smaller, and every groupby keys on integer codes
+        for col in ('Country', 'Description', 'CustomerID', 'InvoiceNo'):
+            self.df[col] = self.df[col].astype('category')
+        # int32 quantities are plenty; money columns stay float64 so totals keep their pence
+        self.df['Quantity'] = self.df['Quantity'].astype('int32')
         self.figures_saved = []
+        self._fig_pool = {}
         logger.info(f"Loaded data: {len(self.df)} rows")
     
+    @classmethod
+    def from_stream(cls, data_path, chunksize=1_000_000, verbose=True):
+        """Build only the group aggregates from data read in chunks (for files too big for memory)
+        
+        self.df stays None, so only the analyses in AGGREGATE_ANALYSES can run, plus the
+        summary report. Unique-customer counts and the median are exact - distinct
+        (group, customer) pairs and distinct sale values are kept, small next to the rows.
+        """
+        eda = cls.__new__(cls)
+        eda.verbose = verbose
+        eda.df = None
+        eda.figures_saved = []
+        eda._fig_pool = {}
+        
+        country = product = customer = monthly = sale_counts = None
+        country_pairs = month_pairs = None
+        rows, revenue = 0, 0.0
+        first_date = last_date = min_sale = max_sale = None
+        
+        def combine(total, part, how='sum'):
+            # fold one chunk's partial aggregate into the running total
+            if total is None:
+                return part
+            return pd.concat([total, part]).groupby(level=0).agg(how)
+        
+        def combine_pairs(pairs, part):
+            return part if pairs is None else pd.concat([pairs, part]).drop_duplicates()
+        
+        def keep(current, value, pick):
+            return value if current is None else pick(current, value)
+        
+        for chunk in iter_chunks(data_path, chunksize):
+            chunk['InvoiceDate'] = pd.to_datetime(chunk['InvoiceDate'])
+            chunk['Month'] = chunk['InvoiceDate'].values.astype('datetime64[M]')
+            sales = chunk['TotalSales']
+            rows += len(chunk)
+            revenue += sales.sum()
+            min_sale, max_sale = keep(min_sale, sales.min(), min), keep(max_sale, sales.max(), max)
+            first_date = keep(first_date, chunk['InvoiceDate'].min(), min)
+            last_date = keep(last_date, chunk['InvoiceDate'].max(), max)
+            sale_counts = combine(sale_counts, sales.value_counts())
+            
+            country = combine(country, chunk.groupby('Country').agg(
+                TotalRevenue=('TotalSales', 'sum'), Transactions=('InvoiceNo', 'size')))
+            product = combine(product, chunk.groupby('Description').agg(
+                Revenue=('TotalSales', 'sum'), QuantitySold=('Quantity', 'sum'),
+                Transactions=('InvoiceNo', 'size'), PriceTotal=('UnitPrice', 'sum')))
+            customer = combine(customer, chunk.groupby('CustomerID').agg(
+                LastPurchase=('InvoiceDate', 'max'), PurchaseFrequency=('InvoiceNo', 'size'),
+                LifetimeValue=('TotalSales', 'sum')),
+                how={'LastPurchase': 'max', 'PurchaseFrequency': 'sum', 'LifetimeValue': 'sum'})
+            monthly = combine(monthly, chunk.groupby('Month').agg(
+                TotalSales=('TotalSales', 'sum'), InvoiceNo=('InvoiceNo', 'count')))
+            
+            country_pairs = combine_pairs(country_pairs, chunk[['Country', 'CustomerID']].dropna().drop_duplicates())
+            month_pairs = combine_pairs(month_pairs, chunk[['Month', 'CustomerID']].dropna().drop_duplicates())
+        
+        country.insert(1, 'UniqueCustomers', country_pairs.groupby('Country').size())
+        monthly.insert(1, 'CustomerID', month_pairs.groupby('Month').size())
+        product['AvgPrice'] = product.pop('PriceTotal') / product['Transactions']
+        
+        # median from the sorted distinct values and their counts (same rule as Series.median)
+        sale_counts = sale_counts.sort_index()
+        positions = sale_counts.to_numpy().cumsum()
+        middle = sale_counts.index[np.searchsorted(positions, [(rows - 1) // 2, rows // 2], side='right')]
+        
+        # Stored where the cached properties look for them, with the same column layout
+        eda.country_agg = country
+        eda.product_agg = product
+        eda.customer_agg = customer
+        eda.monthly_agg = monthly.rename_axis('InvoiceDate')
+        eda.sales_summary = {
+            'rows': rows, 'sum': revenue, 'mean': revenue / rows, 'median': middle.to_numpy().mean(),
+            'min': min_sale, 'max': max_sale, 'first_date': first_date, 'last_date': last_date,
+        }
+        logger.info(f"Streamed data: {rows} rows")
+        return eda
+    
+    def subplots(self, nrows=1, ncols=1, figsize=None):
+        """Like plt.subplots, but hands back a pooled figure of the same shape when there is one"""
+        key = (nrows, ncols, figsize)
+        if key not in self._fig_pool:
+            self._fig_pool[key] = plt.subplots(nrows, ncols, figsize=figsize)
+        fig, axes = self._fig_pool[key]
+        plt.figure(fig.number)  # make it current so plt.* calls land on it
+        return fig, axes
+    
+    def show(self, *lines):
+        """Print a block of output with one write (callers skip this when verbose is off)"""
+        sys.stdout.write('\n'.join(str(line) for line in lines) + '\n')
+    
     def save_figure(self, filename, title):
         """Save figure and track it"""
         filepath = f'notebooks/visualizations/{filename}'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig = plt.gcf()
+        fig.savefig(filepath, dpi=150)
+        
+        # Clear the figure for reuse instead of closing it - extra axes (colorbars) are removed
+        # first, while the plot they belong to still exists, then the pooled axes are wiped
+        pooled = next((axes for f, axes in self._fig_pool.values() if f is fig), None)
+        if pooled is None:
+            plt.close(fig)
+        else:
+            base_axes = list(np.ravel(pooled))
+            for ax in fig.axes:
+                if ax not in base_axes:
+                    ax.remove()
+            for ax in base_axes:
+                ax.clear()
+        
         self.figures_saved.append({'filename': filename, 'title': title})
         logger.info(f"Saved: {filename}")
     
+    # ==================== SHARED AGGREGATES ====================
+    # Several analyses group by the same key - each grouping is done once, on first use
+    
+    @cached_property
+    def sales_summary(self):
+        """Row count, revenue stats and date range for the summary report"""
+        sales = self.df['TotalSales'].agg(['sum', 'mean', 'median', 'min', 'max'])
+        first_date, last_date = self.df['InvoiceDate'].agg(['min', 'max'])
+        return {'rows': len(self.df), **sales.to_dict(), 'first_date': first_date, 'last_date': last_date}
+    
+    @cached_property
+    def country_agg(self):
+        """Revenue, unique customers and transactions per country"""
+        country_agg = self.df.groupby('Country', observed=True).agg(
+            TotalRevenue=('TotalSales', 'sum'),
+            Transactions=('InvoiceNo', 'size')
+        )
+        
+        # Unique customers from the integer codes: every distinct (country, customer) pair
+        # shows up once in np.unique, then bincount tallies the pairs per country
+        countries = self.df['Country'].cat
+        customer_codes = self.df['CustomerID'].cat.codes.to_numpy().astype(np.int64)
+        n_customers = len(self.df['CustomerID'].cat.categories)
+        pairs = np.unique(countries.codes.to_numpy().astype(np.int64) * n_customers + customer_codes)
+        unique_customers = np.bincount(pairs // n_customers, minlength=len(countries.categories))
+        
+        country_agg.insert(1, 'UniqueCustomers',
+                           unique_customers[countries.categories.get_indexer(country_agg.index)])
+        return country_agg
+    
+    @cached_property
+    def product_agg(self):
+        """Revenue, units sold, transactions and average price per product"""
+        # AvgPrice is only shown in the printed table, not in the plots
+        return self.df.groupby('Description', observed=True).agg(
+            Revenue=('TotalSales', 'sum'),
+            QuantitySold=('Quantity', 'sum'),
+            Transactions=('InvoiceNo', 'size'),
+            AvgPrice=('UnitPrice', 'mean')
+        )
+    
+    @cached_property
+    def customer_agg(self):
+        """Last purchase, purchase count and lifetime value per customer"""
+        # One pass over the integer category codes instead of three grouped reductions
+        customer_ids = self.df['CustomerID']
+        codes = customer_ids.cat.codes.to_numpy()
+        n_groups = len(customer_ids.cat.categories)
+        dates = self.df['InvoiceDate'].to_numpy()
+        
+        freq = np.bincount(codes, minlength=n_groups)
+        ltv = np.bincount(codes, weights=self.df['TotalSales'].to_numpy(), minlength=n_groups)
+        last = np.full(n_groups, np.iinfo(np.int64).min)
+        np.maximum.at(last, codes, dates.view('i8'))
+        
+        seen = freq > 0
+        return pd.DataFrame({
+            'LastPurchase': last[seen].view(dates.dtype),
+            'PurchaseFrequency': freq[seen],
+            'LifetimeValue': ltv[seen]
+        }, index=customer_ids.cat.categories[seen].rename('CustomerID'))
+    
+    @cached_property
+    def monthly_agg(self):
+        """Revenue, active customers and transactions per month"""
+        # Truncating to datetime64[M] gives month-start keys without building Period objects
+        month_keys = self.df['InvoiceDate'].values.astype('datetime64[M]')
+        monthly_agg = self.df.groupby(month_keys).agg({
+            'TotalSales': 'sum',
+            'CustomerID': 'nunique',
+            'InvoiceNo': 'count'
+        })
+        monthly_agg.index.name = 'InvoiceDate'
+        return monthly_agg
+    
     # ==================== PHASE 1: UNIVARIATE ANALYSIS ====================
     
     def analyze_sales_distribution(self):
@@ -43,63 +281,77 @@ class ExploratoryDataAnalysis:
         logger.info("\n=== PHASE 1: Univariate Analysis ===")
         logger.info("Analyzing Sales Distribution...")
         
-        print("\nSales Statistics:")
-        print(f"Mean Sales: £{self.df['TotalSales'].mean():.2f}")
-        print(f"Median Sales: £{self.df['TotalSales'].median():.2f}")
-        print(f"Std Dev: £{self.df['TotalSales'].std():.2f}")
-        print(f"Min: £{self.df['TotalSales'].min():.2f}")
-        print(f"Max: £{self.df['TotalSales'].max():.2f}")
-        print(f"Skewness: {self.df['TotalSales'].skew():.2f} (Right-skewed means outliers)")
+        if self.verbose:
+            self.show(
+                "\nSales Statistics:",
+                f"Mean Sales: £{self.df['TotalSales'].mean():.2f}",
+                f"Median Sales: £{self.df['TotalSales'].median():.2f}",
+                f"Std Dev: £{self.df['TotalSales'].std():.2f}",
+                f"Min: £{self.df['TotalSales'].min():.2f}",
+                f"Max: £{self.df['TotalSales'].max():.2f}",
+                f"Skewness: {self.df['TotalSales'].skew():.2f} (Right-skewed means outliers)"
+            )
         
         # Create visualization
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        fig, axes = self.subplots(1, 2, figsize=(14, 5))
+        
+        # Bin once, both panels draw the same counts
+        counts, edges = np.histogram(self.df['TotalSales'].to_numpy(), bins=50)
         
         # Histogram
-        axes[0].hist(self.df['TotalSales'], bins=50, edgecolor='black', color='skyblue')
+        hist_bars(axes[0], counts, edges, edgecolor='black', color='skyblue')
         axes[0].set_xlabel('Sales Amount (£)')
         axes[0].set_ylabel('Frequency')
         axes[0].set_title('Distribution of Sales (All Transactions)')
         axes[0].grid(axis='y', alpha=0.3)
         
         # Histogram with log scale (better for right-skewed)
-        axes[1].hist(self.df['TotalSales'], bins=50, edgecolor='black', color='coral')
+        hist_bars(axes[1], counts, edges, edgecolor='black', color='coral')
         axes[1].set_xlabel('Sales Amount (£)')
         axes[1].set_ylabel('Frequency (Log Scale)')
         axes[1].set_yscale('log')
         axes[1].set_title('Distribution of Sales (Log Scale)')
         axes[1].grid(axis='y', alpha=0.3)
         
-        plt.tight_layout()
         self.save_figure('01_sales_distribution.png', 'Sales Distribution Analysis')
         
         # Box plot to show outliers
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.boxplot(self.df['TotalSales'], vert=True)
+        # Quartiles/whiskers worked out here and drawn with bxp, same 1.5*IQR rule as boxplot
+        sales = self.df['TotalSales'].to_numpy()
+        q1, med, q3 = np.quantile(sales, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = sales[(sales >= q1 - 1.5 * iqr) & (sales <= q3 + 1.5 * iqr)]
+        box = {'med': med, 'q1': q1, 'q3': q3,
+               'whislo': inside.min(), 'whishi': inside.max(),
+               'fliers': sales[(sales < inside.min()) | (sales > inside.max())]}
+        
+        fig, ax = self.subplots(figsize=(10, 6))
+        ax.bxp([box])
         ax.set_ylabel('Sales Amount (£)')
         ax.set_title('Box Plot of Sales (Shows Outliers)')
         ax.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
         self.save_figure('02_sales_boxplot.png', 'Sales Box Plot')
     
     def analyze_quantity_distribution(self):
         """Analyze quantity purchased per transaction"""
         logger.info("Analyzing Quantity Distribution...")
         
-        fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+        fig, axes = self.subplots(1, 2, figsize=(14, 5))
         
-        axes[0].hist(self.df['Quantity'], bins=50, edgecolor='black', color='lightgreen')
+        hist_bars(axes[0], *np.histogram(self.df['Quantity'].to_numpy(), bins=50),
+                  edgecolor='black', color='lightgreen')
         axes[0].set_xlabel('Quantity (units)')
         axes[0].set_ylabel('Frequency')
         axes[0].set_title('Distribution of Quantity Purchased')
         axes[0].grid(axis='y', alpha=0.3)
         
-        axes[1].hist(self.df['UnitPrice'], bins=50, edgecolor='black', color='orange')
+        hist_bars(axes[1], *np.histogram(self.df['UnitPrice'].to_numpy(), bins=50),
+                  edgecolor='black', color='orange')
         axes[1].set_xlabel('Unit Price (£)')
         axes[1].set_ylabel('Frequency')
         axes[1].set_title('Distribution of Unit Price')
         axes[1].grid(axis='y', alpha=0.3)
         
-        plt.tight_layout()
         self.save_figure('03_quantity_price_distribution.png', 'Quantity & Price Distribution')
     
     # ==================== PHASE 2: BIVARIATE ANALYSIS ====================
@@ -109,25 +361,20 @@ class ExploratoryDataAnalysis:
         logger.info("\n=== PHASE 2: Bivariate Analysis ===")
         logger.info("Analyzing Top Countries...")
         
-        country_sales = self.df.groupby('Country').agg({
-            'TotalSales': 'sum',
-            'CustomerID': 'nunique',
-            'InvoiceNo': 'count'
-        }).round(2)
-        country_sales.columns = ['TotalRevenue', 'UniqueCustomers', 'Transactions']
-        country_sales = country_sales.sort_values('TotalRevenue', ascending=False).head(15)
+        country_sales = self.country_agg.nlargest(15, 'TotalRevenue')
         
-        print("\nTop 15 Countries by Revenue:")
-        print(country_sales)
+        if self.verbose:
+            self.show(
+                "\nTop 15 Countries by Revenue:",
+                country_sales.to_string(float_format='{:.2f}'.format)
+            )
         
         # Visualization: Top countries
-        fig, axes = plt.subplots(2, 1, figsize=(12, 10))
+        fig, axes = self.subplots(2, 1, figsize=(12, 10))
         
         # Revenue by country
         top_countries_rev = country_sales['TotalRevenue'].head(10)
-        axes[0].barh(range(len(top_countries_rev)), top_countries_rev.values, color='steelblue')
-        axes[0].set_yticks(range(len(top_countries_rev)))
-        axes[0].set_yticklabels(top_countries_rev.index)
+        axes[0].barh(top_countries_rev.index.tolist(), top_countries_rev.values, color='steelblue')
         axes[0].set_xlabel('Total Revenue (£)')
         axes[0].set_title('Top 10 Countries by Revenue')
         axes[0].invert_yaxis()
@@ -138,92 +385,79 @@ class ExploratoryDataAnalysis:
         
         # Unique customers by country
         top_customers = country_sales['UniqueCustomers'].head(10)
-        axes[1].barh(range(len(top_customers)), top_customers.values, color='coral')
-        axes[1].set_yticks(range(len(top_customers)))
-        axes[1].set_yticklabels(top_customers.index)
+        axes[1].barh(top_customers.index.tolist(), top_customers.values, color='coral')
         axes[1].set_xlabel('Number of Unique Customers')
         axes[1].set_title('Top 10 Countries by Customer Count')
         axes[1].invert_yaxis()
         
-        plt.tight_layout()
         self.save_figure('04_top_countries.png', 'Top Countries Analysis')
     
     def analyze_top_products(self):
         """Top products by revenue and quantity"""
         logger.info("Analyzing Top Products...")
         
-        product_sales = self.df.groupby('Description').agg({
-            'TotalSales': 'sum',
-            'Quantity': 'sum',
-            'InvoiceNo': 'count',
-            'UnitPrice': 'mean'
-        }).round(2)
-        product_sales.columns = ['Revenue', 'QuantitySold', 'Transactions', 'AvgPrice']
-        product_sales = product_sales.sort_values('Revenue', ascending=False).head(15)
+        product_sales = self.product_agg.nlargest(15, 'Revenue')
         
-        print("\nTop 15 Products by Revenue:")
-        print(product_sales)
+        if self.verbose:
+            self.show(
+                "\nTop 15 Products by Revenue:",
+                product_sales.to_string(float_format='{:.2f}'.format)
+            )
         
         # Visualization
-        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+        fig, axes = self.subplots(1, 2, figsize=(14, 6))
         
-        # Top products by revenue
+        # Top products by revenue - numeric bar positions, names as tick labels only, so two
+        # names sharing their first 30 characters still get a bar each
         top_10_products = product_sales['Revenue'].head(10)
         axes[0].barh(range(len(top_10_products)), top_10_products.values, color='darkgreen')
-        axes[0].set_yticks(range(len(top_10_products)))
-        axes[0].set_yticklabels([name[:30] for name in top_10_products.index], fontsize=9)
+        axes[0].set_yticks(range(len(top_10_products)), [name[:30] for name in top_10_products.index], fontsize=9)
         axes[0].set_xlabel('Revenue (£)')
         axes[0].set_title('Top 10 Products by Revenue')
         axes[0].invert_yaxis()
         
         # Quantity sold
-        top_qty = product_sales['QuantitySold'].sort_values(ascending=False).head(10)
+        top_qty = product_sales['QuantitySold'].nlargest(10)
         axes[1].barh(range(len(top_qty)), top_qty.values, color='teal')
-        axes[1].set_yticks(range(len(top_qty)))
-        axes[1].set_yticklabels([name[:30] for name in top_qty.index], fontsize=9)
+        axes[1].set_yticks(range(len(top_qty)), [name[:30] for name in top_qty.index], fontsize=9)
         axes[1].set_xlabel('Quantity Sold (units)')
         axes[1].set_title('Top 10 Products by Quantity')
         axes[1].invert_yaxis()
         
-        plt.tight_layout()
         self.save_figure('05_top_products.png', 'Top Products Analysis')
     
     def analyze_revenue_vs_customers(self):
         """Relationship between customer count and revenue by country"""
         logger.info("Analyzing Revenue vs Customer Count...")
         
-        country_analysis = self.df.groupby('Country').agg({
-            'TotalSales': 'sum',
-            'CustomerID': 'nunique',
-            'InvoiceNo': 'count'
-        })
-        country_analysis.columns = ['Revenue', 'Customers', 'Transactions']
+        country_analysis = self.country_agg.rename(
+            columns={'TotalRevenue': 'Revenue', 'UniqueCustomers': 'Customers'}
+        )
         
         # Filter for countries with significant revenue
         country_analysis = country_analysis[country_analysis['Revenue'] > 500]
         
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig, ax = self.subplots(figsize=(12, 6))
         scatter = ax.scatter(country_analysis['Customers'], 
                            country_analysis['Revenue'],
                            s=country_analysis['Transactions']/2,
                            alpha=0.6, c=country_analysis['Revenue'],
-                           cmap='viridis')
+                           cmap='viridis', rasterized=True)
         
         ax.set_xlabel('Number of Customers')
         ax.set_ylabel('Total Revenue (£)')
         ax.set_title('Revenue vs Customer Count by Country\n(Bubble size = Transaction count)')
         
         # Label major countries
-        for idx, country in enumerate(country_analysis.index):
-            if country_analysis.iloc[idx]['Revenue'] > 2000:
-                ax.annotate(country, 
-                           (country_analysis.iloc[idx]['Customers'],
-                            country_analysis.iloc[idx]['Revenue']),
-                           fontsize=9, alpha=0.7)
+        revenue = country_analysis['Revenue'].values
+        major = revenue > 2000
+        for country, x, y in zip(country_analysis.index.values[major],
+                                 country_analysis['Customers'].values[major],
+                                 revenue[major]):
+            ax.annotate(country, (x, y), fontsize=9, alpha=0.7)
         
         plt.colorbar(scatter, label='Revenue (£)')
         plt.grid(alpha=0.3)
-        plt.tight_layout()
         self.save_figure('06_revenue_vs_customers.png', 'Revenue vs Customers')
     
     # ==================== PHASE 3: TIME SERIES ANALYSIS ====================
@@ -233,18 +467,16 @@ class ExploratoryDataAnalysis:
         logger.info("\n=== PHASE 3: Time Series Analysis ===")
         logger.info("Analyzing Monthly Trends...")
         
-        monthly_sales = self.df.groupby(self.df['InvoiceDate'].dt.to_period('M')).agg({
-            'TotalSales': 'sum',
-            'CustomerID': 'nunique',
-            'InvoiceNo': 'count'
-        }).round(2)
-        monthly_sales.index = monthly_sales.index.to_timestamp()
+        monthly_sales = self.monthly_agg
         
-        print("\nMonthly Sales Summary:")
-        print(monthly_sales.tail(10))
+        if self.verbose:
+            self.show(
+                "\nMonthly Sales Summary:",
+                monthly_sales.tail(10).to_string(float_format='{:.2f}'.format)
+            )
         
         # Visualization
-        fig, axes = plt.subplots(3, 1, figsize=(14, 10))
+        fig, axes = self.subplots(3, 1, figsize=(14, 10))
         
         # Revenue trend
         axes[0].plot(monthly_sales.index, monthly_sales['TotalSales'], 
@@ -269,50 +501,50 @@ class ExploratoryDataAnalysis:
         axes[2].set_title('Monthly Transaction Volume')
         axes[2].grid(alpha=0.3, axis='y')
         
-        plt.tight_layout()
         self.save_figure('07_monthly_trends.png', 'Monthly Trends')
     
     def analyze_day_of_week(self):
         """Sales patterns by day of week"""
         logger.info("Analyzing Day of Week Patterns...")
         
-        self.df['DayOfWeek'] = self.df['InvoiceDate'].dt.day_name()
         day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         
-        day_sales = self.df.groupby('DayOfWeek')['TotalSales'].agg(['sum', 'count', 'mean'])
-        day_sales = day_sales.reindex(day_order)
+        # Group on the 0-6 weekday code and only put the day names on the 7 result rows
+        codes = self.df['InvoiceDate'].dt.weekday.values
+        day_sales = self.df.groupby(codes)['TotalSales'].agg(['sum', 'count', 'mean'])
+        day_sales = day_sales.reindex(range(7))
+        day_sales.index = pd.Index(day_order, name='DayOfWeek')
         
-        print("\nSales by Day of Week:")
-        print(day_sales)
+        if self.verbose:
+            self.show(
+                "\nSales by Day of Week:",
+                day_sales
+            )
         
         # Visualization
-        fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+        fig, axes = self.subplots(1, 3, figsize=(15, 4))
         
         colors = ['green' if day in ['Friday', 'Saturday', 'Sunday'] else 'steelblue' 
                  for day in day_sales.index]
         
-        axes[0].bar(range(len(day_sales)), day_sales['sum'], color=colors, alpha=0.7)
-        axes[0].set_xticks(range(len(day_sales)))
-        axes[0].set_xticklabels(day_sales.index, rotation=45)
+        axes[0].bar(day_order, day_sales['sum'], color=colors, alpha=0.7)
+        axes[0].tick_params(axis='x', rotation=45)
         axes[0].set_ylabel('Total Revenue (£)')
         axes[0].set_title('Revenue by Day of Week')
         axes[0].grid(axis='y', alpha=0.3)
         
-        axes[1].bar(range(len(day_sales)), day_sales['count'], color=colors, alpha=0.7)
-        axes[1].set_xticks(range(len(day_sales)))
-        axes[1].set_xticklabels(day_sales.index, rotation=45)
+        axes[1].bar(day_order, day_sales['count'], color=colors, alpha=0.7)
+        axes[1].tick_params(axis='x', rotation=45)
         axes[1].set_ylabel('Transaction Count')
         axes[1].set_title('Transactions by Day of Week')
         axes[1].grid(axis='y', alpha=0.3)
         
-        axes[2].bar(range(len(day_sales)), day_sales['mean'], color=colors, alpha=0.7)
-        axes[2].set_xticks(range(len(day_sales)))
-        axes[2].set_xticklabels(day_sales.index, rotation=45)
+        axes[2].bar(day_order, day_sales['mean'], color=colors, alpha=0.7)
+        axes[2].tick_params(axis='x', rotation=45)
         axes[2].set_ylabel('Average Transaction Value (£)')
         axes[2].set_title('Avg Transaction Value by Day')
         axes[2].grid(axis='y', alpha=0.3)
         
-        plt.tight_layout()
         self.save_figure('08_day_of_week.png', 'Day of Week Analysis')
     
     # ==================== PHASE 4: CUSTOMER ANALYSIS ====================
@@ -323,58 +555,63 @@ class ExploratoryDataAnalysis:
         logger.info("Analyzing Customer Segments...")
         
         # Calculate customer metrics
-        customer_analysis = self.df.groupby('CustomerID').agg({
-            'InvoiceDate': 'max',
-            'InvoiceNo': 'count',
-            'TotalSales': 'sum'
-        })
-        customer_analysis.columns = ['LastPurchase', 'PurchaseFrequency', 'LifetimeValue']
-        
-        print("\nCustomer Metrics Summary:")
-        print(f"Total Customers: {len(customer_analysis)}")
-        print(f"Avg Lifetime Value: £{customer_analysis['LifetimeValue'].mean():.2f}")
-        print(f"Median Lifetime Value: £{customer_analysis['LifetimeValue'].median():.2f}")
-        print(f"Avg Purchase Frequency: {customer_analysis['PurchaseFrequency'].mean():.1f}")
-        
-        # Segment by lifetime value
-        customer_analysis['Segment'] = pd.cut(
-            customer_analysis['LifetimeValue'],
-            bins=[0, 500, 1500, 5000, float('inf')],
-            labels=['Low Value', 'Medium Value', 'High Value', 'Top Tier']
-        )
-        
-        segment_summary = customer_analysis.groupby('Segment').agg({
+        customer_analysis = self.customer_agg
+        
+        if self.verbose:
+            self.show(
+                "\nCustomer Metrics Summary:",
+                f"Total Customers: {len(customer_analysis)}",
+                f"Avg Lifetime Value: £{customer_analysis['LifetimeValue'].mean():.2f}",
+                f"Median Lifetime Value: £{customer_analysis['LifetimeValue'].median():.2f}",
+                f"Avg Purchase Frequency: {customer_analysis['PurchaseFrequency'].mean():.1f}"
+            )
+        
+        # Segment by lifetime value (assign returns a new frame - the cached aggregate stays as is)
+        customer_analysis = customer_analysis.assign(Segment=pd.cut(
+            customer_analysis['LifetimeValue'].to_numpy(),
+            bins=[0, 500, 1500, 5000, np.inf],
+            labels=['Low Value', 'Medium Value', 'High Value', 'Top Tier'],
+            include_lowest=True
+        ))
+        
+        segment_summary = customer_analysis.groupby('Segment', observed=True).agg({
             'LifetimeValue': ['count', 'sum', 'mean'],
             'PurchaseFrequency': 'mean'
         }).round(2)
         
-        print("\nCustomer Segments:")
-        print(segment_summary)
+        if self.verbose:
+            self.show(
+                "\nCustomer Segments:",
+                segment_summary
+            )
         
         # Visualization
-        fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+        fig, axes = self.subplots(2, 2, figsize=(14, 10))
         
         # Lifetime value distribution
-        axes[0, 0].hist(customer_analysis['LifetimeValue'], bins=50, 
-                       edgecolor='black', color='skyblue')
+        hist_bars(axes[0, 0], *np.histogram(customer_analysis['LifetimeValue'].to_numpy(), bins=50),
+                  edgecolor='black', color='skyblue')
         axes[0, 0].set_xlabel('Lifetime Value (£)')
         axes[0, 0].set_ylabel('Number of Customers')
         axes[0, 0].set_title('Distribution of Customer Lifetime Value')
         axes[0, 0].grid(axis='y', alpha=0.3)
         
         # Purchase frequency distribution
-        axes[0, 1].hist(customer_analysis['PurchaseFrequency'], bins=30,
-                       edgecolor='black', color='lightcoral')
+        hist_bars(axes[0, 1], *np.histogram(customer_analysis['PurchaseFrequency'].to_numpy(), bins=30),
+                  edgecolor='black', color='lightcoral')
         axes[0, 1].set_xlabel('Purchase Frequency')
         axes[0, 1].set_ylabel('Number of Customers')
         axes[0, 1].set_title('Distribution of Purchase Frequency')
         axes[0, 1].grid(axis='y', alpha=0.3)
         
-        # Frequency vs Lifetime Value (scatter)
-        scatter = axes[1, 0].scatter(customer_analysis['PurchaseFrequency'],
-                                    customer_analysis['LifetimeValue'],
-                                    alpha=0.5, s=50, c=customer_analysis['LifetimeValue'],
-                                    cmap='viridis')
+        # Frequency vs Lifetime Value (scatter) - on a fixed random sample when there are lots of customers
+        n = len(customer_analysis)
+        idx = np.sort(np.random.default_rng(0).choice(n, size=min(MAX_SCATTER_POINTS, n), replace=False))
+        sample = customer_analysis.iloc[idx]
+        scatter = axes[1, 0].scatter(sample['PurchaseFrequency'],
+                                    sample['LifetimeValue'],
+                                    alpha=0.5, s=50, c=sample['LifetimeValue'],
+                                    cmap='viridis', rasterized=True)
         axes[1, 0].set_xlabel('Purchase Frequency')
         axes[1, 0].set_ylabel('Lifetime Value (£)')
         axes[1, 0].set_title('Frequency vs Lifetime Value')
@@ -387,7 +624,6 @@ class ExploratoryDataAnalysis:
                       colors=['#ff9999', '#ffcc99', '#99ccff', '#99ff99'])
         axes[1, 1].set_title('Customer Distribution by Segment')
         
-        plt.tight_layout()
         self.save_figure('09_customer_analysis.png', 'Customer Segmentation')
     
     # ==================== PHASE 5: CORRELATION ANALYSIS ====================
@@ -401,51 +637,59 @@ class ExploratoryDataAnalysis:
         numeric_cols = ['Quantity', 'UnitPrice', 'TotalSales']
         correlation_matrix = self.df[numeric_cols].corr()
         
-        print("\nCorrelation Matrix:")
-        print(correlation_matrix)
+        if self.verbose:
+            self.show(
+                "\nCorrelation Matrix:",
+                correlation_matrix
+            )
         
         # Visualization: Heatmap
-        fig, ax = plt.subplots(figsize=(8, 6))
+        fig, ax = self.subplots(figsize=(8, 6))
         sns.heatmap(correlation_matrix, annot=True, fmt='.2f', cmap='coolwarm',
                    center=0, square=True, ax=ax, cbar_kws={'label': 'Correlation'})
         ax.set_title('Correlation Matrix - Key Variables')
-        plt.tight_layout()
         self.save_figure('10_correlation_heatmap.png', 'Correlation Analysis')
     
     def generate_summary_report(self):
         """Generate summary statistics report"""
         logger.info("\nGenerating Summary Report...")
         
+        # Everything comes from the cached aggregates, so this also works after from_stream()
+        sales = self.sales_summary
+        first_date, last_date = sales['first_date'], sales['last_date']
+        country_revenue = self.country_agg['TotalRevenue']
+        
         report = f"""
         ===========================================
         EXPLORATORY DATA ANALYSIS SUMMARY REPORT
         ===========================================
         
         Dataset Overview:
-        - Total Transactions: {len(self.df):,}
-        - Unique Customers: {self.df['CustomerID'].nunique():,}
-        - Countries Covered: {self.df['Country'].nunique()}
-        - Analysis Period: {self.df['InvoiceDate'].min().date()} to {self.df['InvoiceDate'].max().date()}
+        - Total Transactions: {sales['rows']:,}
+        - Unique Customers: {len(self.customer_agg):,}
+        - Countries Covered: {len(self.country_agg)}
+        - Analysis Period: {first_date.date()} to {last_date.date()}
         
         Revenue Metrics:
-        - Total Revenue: £{self.df['TotalSales'].sum():,.2f}
-        - Average Transaction: £{self.df['TotalSales'].mean():.2f}
-        - Median Transaction: £{self.df['TotalSales'].median():.2f}
-        - Revenue Range: £{self.df['TotalSales'].min():.2f} - £{self.df['TotalSales'].max():.2f}
+        - Total Revenue: £{sales['sum']:,.2f}
+        - Average Transaction: £{sales['mean']:.2f}
+        - Median Transaction: £{sales['median']:.2f}
+        - Revenue Range: £{sales['min']:.2f} - £{sales['max']:.2f}
         
         Customer Metrics:
-        - Average Customer Lifetime Value: £{self.df.groupby('CustomerID')['TotalSales'].sum().mean():.2f}
-        - Average Transactions per Customer: {self.df.groupby('CustomerID')['InvoiceNo'].count().mean():.1f}
-        - Unique Products: {self.df['Description'].nunique()}
+        - Average Customer Lifetime Value: £{self.customer_agg['LifetimeValue'].mean():.2f}
+        - Average Transactions per Customer: {self.customer_agg['PurchaseFrequency'].mean():.1f}
+        - Unique Products: {len(self.product_agg)}
         
         Geographic Insights:
-        - Top Country: {self.df.groupby('Country')['TotalSales'].sum().idxmax()} 
-          (£{self.df.groupby('Country')['TotalSales'].sum().max():,.2f})
+        - Top Country: {country_revenue.idxmax()} 
+          (£{country_revenue.max():,.2f})
         
         Visualizations Created: {len(self.figures_saved)}
         """
         
-        print(report)
+        if self.verbose:
+            self.show(report)
         
         # Save report
         with open('notebooks/EDA_SUMMARY_REPORT.txt', 'w') as f:
@@ -454,24 +698,50 @@ class ExploratoryDataAnalysis:
         logger.info("Summary report saved")
 
 
-def main():
-    """Main execution"""
-    eda = ExploratoryDataAnalysis('data/cleaned_data.csv')
+# Independent analyses - each only reads self.df and writes its own figure
+ANALYSES = [
+    'analyze_sales_distribution',
+    'analyze_quantity_distribution',
+    'analyze_top_countries',
+    'analyze_top_products',
+    'analyze_revenue_vs_customers',
+    'analyze_monthly_trends',
+    'analyze_day_of_week',
+    'analyze_customer_segments',
+    'analyze_correlations',
+]
+
+# The analyses that only need the group aggregates - the ones main(stream=True) runs
+AGGREGATE_ANALYSES = [
+    'analyze_top_countries',
+    'analyze_top_products',
+    'analyze_revenue_vs_customers',
+    'analyze_monthly_trends',
+    'analyze_customer_segments',
+]
+
+def main(df=None, analyses=None, processes=None, verbose=True, stream=False):
+    """Main execution - pass df to skip re-reading the cleaned data, analyses to run a subset,
+    verbose=False to only write the charts and report file, stream=True to read the data in
+    chunks (for files too big for memory - only the aggregate analyses run then)"""
+    if stream:
+        analyses = AGGREGATE_ANALYSES if analyses is None else analyses
+        needs_rows = sorted(set(analyses) - set(AGGREGATE_ANALYSES))
+        if needs_rows:
+            raise ValueError(f"These analyses need the full data, not a stream: {needs_rows}")
+        eda = ExploratoryDataAnalysis.from_stream('data/cleaned_data.parquet', verbose=verbose)
+    else:
+        analyses = ANALYSES if analyses is None else analyses
+        eda = ExploratoryDataAnalysis('data/cleaned_data.parquet', df=df, verbose=verbose)
+    
+    # aggregates shared by several analyses get built before forking, so every worker inherits them
+    run_analyses(eda, analyses, processes, shared=('country_agg', 'customer_agg'), collect='figures_saved')
     
-    # Run all analyses
-    eda.analyze_sales_distribution()
-    eda.analyze_quantity_distribution()
-    eda.analyze_top_countries()
-    eda.analyze_top_products()
-    eda.analyze_revenue_vs_customers()
-    eda.analyze_monthly_trends()
-    eda.analyze_day_of_week()
-    eda.analyze_customer_segments()
-    eda.analyze_correlations()
     eda.generate_summary_report()
     
     logger.info(f"\n✅ EDA Complete! {len(eda.figures_saved)} visualizations created")
+    return eda.figures_saved
 
 
 if __name__ == "__main__":
-    main()
+    main(stream='--stream' in sys.argv[1:])
@@ -9,23 +9,111 @@ Demonstrates proper use of statistics with interpretation.
 import pandas as pd
 import numpy as np
 from scipy import stats
+from functools import cached_property
+from pathlib import Path
 import logging
+import os
+
+try:
+    from src.analysis_pool import run_analyses  # imported as src.NN_... (app, tests)
+except ModuleNotFoundError:
+    from analysis_pool import run_analyses  # run as a script: python src/NN_....py
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+RESULTS_DIR = Path('results')
+# RFM score (0-3) -> segment code: 0-1 Low, 2 Medium, 3 High
+SEGMENT_CODES = np.array([0, 0, 1, 2], dtype=np.int8)
+# Everything the analyses below touch - the rest of the cleaned file is skipped on load
+COLUMNS = ['CustomerID', 'InvoiceNo', 'InvoiceDate', 'Description', 'Quantity', 'UnitPrice', 'TotalSales']
+
 
 class StatisticalAnalysis:
-    def __init__(self, data_path):
-        """Initialize with cleaned data"""
-        self.df = pd.read_csv(data_path)
-        self.df['InvoiceDate'] = pd.to_datetime(self.df['InvoiceDate'])
+    def __init__(self, data_path, df=None):
+        """Initialize with cleaned data (or a DataFrame that's already loaded)"""
+        RESULTS_DIR.mkdir(exist_ok=True)  # once up front, so the first report of a fresh checkout can't fail
+        if df is None:
+            # only read the columns the analyses actually use
+            if data_path.endswith('.parquet'):
+                df = pd.read_parquet(data_path, columns=COLUMNS)
+            else:
+                # pyarrow's multithreaded reader, which also picks up InvoiceDate as a timestamp
+                df = pd.read_csv(data_path, engine='pyarrow', usecols=COLUMNS,
+                                 dtype={'Quantity': 'int32', 'UnitPrice': 'float64',
+                                        'TotalSales': 'float64'})
+        else:
+            # shallow copy - with copy-on-write the casts below never touch the caller's data
+            df = df.copy(deep=False)
+        self.df = df
+        self.df['InvoiceDate'] = pd.to_datetime(self.df['InvoiceDate'], cache=True)  # no-op when already parsed
+        
+        # Same compact dtypes as the EDA step: int32 quantities, and IDs/text as category so the
+        # groupbys below key on integer codes instead of hashing strings. Money stays float64
+        # so every report total keeps its pence
+        self.df['Quantity'] = self.df['Quantity'].astype('int32')
+        for col in ('CustomerID', 'Description'):
+            self.df[col] = self.df[col].astype('category')
         logger.info(f"Loaded {len(self.df)} transactions")
+        
+        # Most analyses work per customer - group once and share the results
+        # (sort=False: nothing downstream needs the IDs in order)
+        self._cust_gb = self.df.groupby('CustomerID', sort=False, observed=True)
+        self._customer_ltv = self._cust_gb['TotalSales'].sum()
+        self._purchase_freq = self._cust_gb['InvoiceNo'].size()
+        self._cust_last = self._cust_gb['InvoiceDate'].max()
+    
+    # ==================== SHARED SCALARS ====================
+    # Numbers several reports quote - worked out once on first use
+    
+    @cached_property
+    def _revenue_stats(self):
+        """TotalSales mean/std/min/max/sum and the report percentiles (numpy on one array), plus the mode"""
+        # float64 source, so sum/mean/std accumulate in float64 even if a caller hands in float32
+        arr = np.ascontiguousarray(self.df['TotalSales'].to_numpy(dtype=np.float64))
+        q01, q05, q25, q50, q75, q95, q99 = np.quantile(arr, [0.01, 0.05, 0.25, 0.50, 0.75, 0.95, 0.99])
+        return {
+            'mean': arr.mean(), 'std': arr.std(ddof=1),  # ddof=1 to match pandas' sample std
+            'min': arr.min(), 'max': arr.max(), 'sum': arr.sum(),
+            'q01': q01, 'q05': q05, 'q25': q25, 'median': q50, 'q75': q75, 'q95': q95, 'q99': q99,
+            'mode': self.df['TotalSales'].mode()[0],  # hash-based, smallest value on ties
+        }
+    
+    @cached_property
+    def _customer_ltv_stats(self):
+        """Revenue from the top 20%/top 10%/bottom 50% of customers, from one sort"""
+        sorted_ltv = np.sort(self._customer_ltv.to_numpy(dtype=np.float64))  # float64 so the share totals keep their pence
+        n = sorted_ltv.size
+        top20_n, top10_n, bottom50_n = int(n * 0.2), int(n * 0.1), int(n * 0.5)
+        # n - k so an empty slice stays empty
+        return {
+            'total': sorted_ltv.sum(),
+            'top20_n': top20_n, 'top10_n': top10_n, 'bottom50_n': bottom50_n,
+            'top20_sum': sorted_ltv[n - top20_n:].sum(),
+            'top10_sum': sorted_ltv[n - top10_n:].sum(),
+            'bottom50_sum': sorted_ltv[:bottom50_n].sum(),
+        }
+    
+    @cached_property
+    def _repeat_stats(self):
+        """Purchase-frequency bucket counts and the repeat rate, from one bincount"""
+        # bins are [1], [2-5], [6-10], [11-49], [50-99], [100+]
+        freq = self._purchase_freq.to_numpy()
+        counts = np.bincount(np.digitize(freq, [1, 2, 6, 11, 50, 100]), minlength=7)
+        total_customers = freq.size
+        repeat_customers = total_customers - counts[1]
+        return {
+            'counts': counts, 'max': freq.max(), 'total': total_customers,
+            'repeat_customers': repeat_customers, 'repeat_rate': repeat_customers / total_customers,
+        }
     
     def save_report(self, filename, content):
-        """Save text report"""
-        with open(f'results/{filename}', 'w') as f:
+        """Save text report - written to a temp file then swapped in, so readers never see half a report"""
+        path = RESULTS_DIR / filename
+        tmp_path = path.with_name(path.name + '.tmp')
+        with tmp_path.open('w', buffering=1 << 20, encoding='utf-8') as f:
             f.write(content)
+        os.replace(tmp_path, path)
         logger.info(f"Saved: {filename}")
     
     # ==================== DESCRIPTIVE STATISTICS ====================
@@ -36,40 +124,46 @@ class StatisticalAnalysis:
         
         sales = self.df['TotalSales']
         
+        rev = self._revenue_stats
+        mean, std, mn, mx = rev['mean'], rev['std'], rev['min'], rev['max']
+        q01, q05, q25, q50, q75, q95, q99 = (rev[k] for k in ('q01', 'q05', 'q25', 'median', 'q75', 'q95', 'q99'))
+        # every number in the report worked out up front - nothing gets computed inside the template
+        count, mode, skew, kurt = len(sales), rev['mode'], sales.skew(), sales.kurtosis()
+        
         report = f"""
         REVENUE STATISTICS
         ==================
         
         Basic Metrics:
-        - Count: {len(sales):,}
-        - Mean: £{sales.mean():.2f}
-        - Median: £{sales.median():.2f}
-        - Mode: £{sales.mode()[0]:.2f}
-        - Std Dev: £{sales.std():.2f}
+        - Count: {count:,}
+        - Mean: £{mean:.2f}
+        - Median: £{q50:.2f}
+        - Mode: £{mode:.2f}
+        - Std Dev: £{std:.2f}
         
         Range:
-        - Minimum: £{sales.min():.2f}
-        - Maximum: £{sales.max():.2f}
-        - Range (Max-Min): £{sales.max() - sales.min():.2f}
+        - Minimum: £{mn:.2f}
+        - Maximum: £{mx:.2f}
+        - Range (Max-Min): £{mx - mn:.2f}
         
         Distribution Shape:
-        - Skewness: {sales.skew():.3f} (RIGHT-SKEWED: Large positive skew)
-        - Kurtosis: {sales.kurtosis():.3f}
+        - Skewness: {skew:.3f} (RIGHT-SKEWED: Large positive skew)
+        - Kurtosis: {kurt:.3f}
         - Interpretation: Right-skewed = Most transactions small; few very large
         
         Percentiles:
-        - 1st: £{sales.quantile(0.01):.2f}
-        - 5th: £{sales.quantile(0.05):.2f}
-        - 25th (Q1): £{sales.quantile(0.25):.2f}
-        - 50th (Median): £{sales.quantile(0.50):.2f}
-        - 75th (Q3): £{sales.quantile(0.75):.2f}
-        - 95th: £{sales.quantile(0.95):.2f}
-        - 99th: £{sales.quantile(0.99):.2f}
+        - 1st: £{q01:.2f}
+        - 5th: £{q05:.2f}
+        - 25th (Q1): £{q25:.2f}
+        - 50th (Median): £{q50:.2f}
+        - 75th (Q3): £{q75:.2f}
+        - 95th: £{q95:.2f}
+        - 99th: £{q99:.2f}
         
         WHAT I NOTICED:
-        - The median (£{sales.median():.2f}) is lower than the mean (£{sales.mean():.2f})
+        - The median (£{q50:.2f}) is lower than the mean (£{mean:.2f})
           → This means extreme high values exist pulling the average up; median is what "typical" looks like
-        - The 99th percentile (£{sales.quantile(0.99):.2f}) is much higher
+        - The 99th percentile (£{q99:.2f}) is much higher
           → Top 1% of orders are significantly larger
         - The data is right-skewed (skewness > 1)
           → Most orders are small, but a few are very large; might be worth targeting those high-value orders
@@ -86,7 +180,14 @@ class StatisticalAnalysis:
         """Analyze customer lifetime value distribution"""
         logger.info("\n=== CUSTOMER LIFETIME VALUE ANALYSIS ===")
         
-        customer_ltv = self.df.groupby('CustomerID')['TotalSales'].sum()
+        customer_ltv = self._customer_ltv
+        
+        ltv = self._customer_ltv_stats
+        total, top20_n, top10_n, bottom50_n = ltv['total'], ltv['top20_n'], ltv['top10_n'], ltv['bottom50_n']
+        top20_sum, top10_sum, bottom50_sum = ltv['top20_sum'], ltv['top10_sum'], ltv['bottom50_sum']
+        # LTV summary numbers up front; all six percentiles (median included) from one quantile call
+        ltv_mean, ltv_std, ltv_min, ltv_max = customer_ltv.mean(), customer_ltv.std(), customer_ltv.min(), customer_ltv.max()
+        p25, p50, p75, p80, p90, p99 = customer_ltv.quantile([0.25, 0.50, 0.75, 0.80, 0.90, 0.99]).to_numpy()
         
         report = f"""
         CUSTOMER LIFETIME VALUE DISTRIBUTION
@@ -95,42 +196,42 @@ class StatisticalAnalysis:
         Total Customers: {len(customer_ltv):,}
         
         LTV Statistics:
-        - Mean: £{customer_ltv.mean():.2f}
-        - Median: £{customer_ltv.median():.2f}
-        - Std Dev: £{customer_ltv.std():.2f}
-        - Min: £{customer_ltv.min():.2f}
-        - Max: £{customer_ltv.max():.2f}
+        - Mean: £{ltv_mean:.2f}
+        - Median: £{p50:.2f}
+        - Std Dev: £{ltv_std:.2f}
+        - Min: £{ltv_min:.2f}
+        - Max: £{ltv_max:.2f}
         
         LTV Percentiles:
-        - 25th (Bottom 75%): £{customer_ltv.quantile(0.25):.2f}
-        - 50th (Median): £{customer_ltv.quantile(0.50):.2f}
-        - 75th (Top 25%): £{customer_ltv.quantile(0.75):.2f}
-        - 90th (Top 10%): £{customer_ltv.quantile(0.90):.2f}
-        - 99th (Top 1%): £{customer_ltv.quantile(0.99):.2f}
+        - 25th (Bottom 75%): £{p25:.2f}
+        - 50th (Median): £{p50:.2f}
+        - 75th (Top 25%): £{p75:.2f}
+        - 90th (Top 10%): £{p90:.2f}
+        - 99th (Top 1%): £{p99:.2f}
         
         CUSTOMER SEGMENTATION:
         
         Top 20% Customers:
-        - Count: {int(len(customer_ltv) * 0.2):,}
-        - Threshold LTV: £{customer_ltv.quantile(0.80):.2f}+
-        - Total Revenue: £{customer_ltv.nlargest(int(len(customer_ltv) * 0.2)).sum():,.2f}
-        - Revenue %: {100 * customer_ltv.nlargest(int(len(customer_ltv) * 0.2)).sum() / customer_ltv.sum():.1f}%
+        - Count: {top20_n:,}
+        - Threshold LTV: £{p80:.2f}+
+        - Total Revenue: £{top20_sum:,.2f}
+        - Revenue %: {100 * top20_sum / total:.1f}%
         
         Top 10% Customers:
-        - Count: {int(len(customer_ltv) * 0.1):,}
-        - Threshold LTV: £{customer_ltv.quantile(0.90):.2f}+
-        - Total Revenue: £{customer_ltv.nlargest(int(len(customer_ltv) * 0.1)).sum():,.2f}
-        - Revenue %: {100 * customer_ltv.nlargest(int(len(customer_ltv) * 0.1)).sum() / customer_ltv.sum():.1f}%
+        - Count: {top10_n:,}
+        - Threshold LTV: £{p90:.2f}+
+        - Total Revenue: £{top10_sum:,.2f}
+        - Revenue %: {100 * top10_sum / total:.1f}%
         
         Bottom 50% Customers:
-        - Count: {int(len(customer_ltv) * 0.5):,}
-        - Threshold LTV: < £{customer_ltv.quantile(0.50):.2f}
-        - Total Revenue: £{customer_ltv.nsmallest(int(len(customer_ltv) * 0.5)).sum():,.2f}
-        - Revenue %: {100 * customer_ltv.nsmallest(int(len(customer_ltv) * 0.5)).sum() / customer_ltv.sum():.1f}%
+        - Count: {bottom50_n:,}
+        - Threshold LTV: < £{p50:.2f}
+        - Total Revenue: £{bottom50_sum:,.2f}
+        - Revenue %: {100 * bottom50_sum / total:.1f}%
         
         WHAT I FOUND:
         - "80/20 Rule": Does 20% of customers really generate 80% of revenue?
-        - My data: {100 * customer_ltv.nlargest(int(len(customer_ltv) * 0.2)).sum() / customer_ltv.sum():.1f}% from top 20%
+        - My data: {100 * top20_sum / total:.1f}% from top 20%
         - It appears this is true - there's a real concentration pattern with a few customers driving most sales
         
         WHAT THIS MEANS:
@@ -151,21 +252,26 @@ class StatisticalAnalysis:
         logger.info("\n=== REPEAT PURCHASE RATE ANALYSIS ===")
         
         # Purchases per customer
-        purchase_freq = self.df.groupby('CustomerID')['InvoiceNo'].count()
+        purchase_freq = self._purchase_freq
+        
+        # Every bucket in the report from one pass (shared with the executive summary)
+        rep = self._repeat_stats
+        counts = rep['counts']
+        one_time, two_to_five, six_to_ten = counts[1], counts[2], counts[3]
+        eleven_plus, fifty_plus, hundred_plus = counts[4:].sum(), counts[5:].sum(), counts[6]
         
-        repeat_customers = (purchase_freq > 1).sum()
-        total_customers = len(purchase_freq)
-        repeat_rate = repeat_customers / total_customers
+        total_customers, repeat_customers, repeat_rate = rep['total'], rep['repeat_customers'], rep['repeat_rate']
+        champion = rep['max']
         
         report = f"""
         REPEAT CUSTOMER ANALYSIS
         ========================
         
         Purchase Frequency Distribution:
-        - One-time buyers: {(purchase_freq == 1).sum():,} ({100*(purchase_freq == 1).sum()/len(purchase_freq):.1f}%)
-        - 2-5 purchases: {((purchase_freq >= 2) & (purchase_freq <= 5)).sum():,} ({100*((purchase_freq >= 2) & (purchase_freq <= 5)).sum()/len(purchase_freq):.1f}%)
-        - 6-10 purchases: {((purchase_freq >= 6) & (purchase_freq <= 10)).sum():,} ({100*((purchase_freq >= 6) & (purchase_freq <= 10)).sum()/len(purchase_freq):.1f}%)
-        - 11+ purchases: {(purchase_freq > 10).sum():,} ({100*(purchase_freq > 10).sum()/len(purchase_freq):.1f}%)
+        - One-time buyers: {one_time:,} ({100*one_time/total_customers:.1f}%)
+        - 2-5 purchases: {two_to_five:,} ({100*two_to_five/total_customers:.1f}%)
+        - 6-10 purchases: {six_to_ten:,} ({100*six_to_ten/total_customers:.1f}%)
+        - 11+ purchases: {eleven_plus:,} ({100*eleven_plus/total_customers:.1f}%)
         
         Retention Metrics:
         - Total customers: {total_customers:,}
@@ -184,9 +290,9 @@ class StatisticalAnalysis:
         - This would mean: loyalty program could convert some of those one-time buyers
         
         Most Loyal Customers:
-        - {(purchase_freq >= 50).sum()} customers bought 50+ times
-        - {(purchase_freq >= 100).sum()} customers bought 100+ times
-        - Single champion customer: {purchase_freq.max()} transactions
+        - {fifty_plus} customers bought 50+ times
+        - {hundred_plus} customers bought 100+ times
+        - Single champion customer: {champion} transactions
         
         WHAT THIS SUGGESTS:
         1. Most of the customer base (75%) only bought once - not ideal
@@ -209,15 +315,11 @@ class StatisticalAnalysis:
         # Get most recent date in dataset
         max_date = self.df['InvoiceDate'].max()
         
-        # Calculate RFM metrics per customer
-        rfm = self.df.groupby('CustomerID').agg({
-            'InvoiceDate': lambda x: (max_date - x.max()).days,  # recency
-            'InvoiceNo': 'count',  # frequency
-            'TotalSales': 'sum'  # monetary
-        }).rename(columns={
-            'InvoiceDate': 'Recency',
-            'InvoiceNo': 'Frequency',
-            'TotalSales': 'Monetary'
+        # Calculate RFM metrics per customer - all three from the per-customer results __init__ keeps
+        rfm = pd.DataFrame({
+            'Recency': (max_date - self._cust_last).dt.days.astype('int32'),  # days since last purchase
+            'Frequency': self._purchase_freq,
+            'Monetary': self._customer_ltv
         })
         
         print(f"\nRFM Metrics Explanation:")
@@ -240,16 +342,31 @@ class StatisticalAnalysis:
         frequency_threshold = rfm['Frequency'].quantile(0.50)  # frequent = better half
         monetary_threshold = rfm['Monetary'].quantile(0.50)  # high spend = better half
         
-        # Simple scoring: count how many "good" metrics each customer has
-        rfm['Score'] = 0
-        rfm.loc[rfm['Recency'] <= recency_threshold, 'Score'] += 1  # recent is good
-        rfm.loc[rfm['Frequency'] >= frequency_threshold, 'Score'] += 1  # frequent is good
-        rfm.loc[rfm['Monetary'] >= monetary_threshold, 'Score'] += 1  # high spend is good
-        
-        # Categorize based on score
-        rfm['Segment'] = 'Low Value'
-        rfm.loc[rfm['Score'] == 2, 'Segment'] = 'Medium Value'
-        rfm.loc[rfm['Score'] == 3, 'Segment'] = 'High Value'
+        # Simple scoring: count how many "good" metrics each customer has (0-3)
+        # (added into one int8 buffer in place, so no extra temporaries per criterion)
+        score = (rfm['Recency'].to_numpy() <= recency_threshold).view(np.int8)  # recent is good
+        score += rfm['Frequency'].to_numpy() >= frequency_threshold  # frequent is good
+        score += rfm['Monetary'].to_numpy() >= monetary_threshold  # high spend is good
+        rfm['Score'] = score
+        
+        # Categorize based on score: 0-1 = Low, 2 = Medium, 3 = High (lookup table score -> code)
+        rfm['Segment'] = pd.Categorical.from_codes(SEGMENT_CODES[score],
+                                                   ['Low Value', 'Medium Value', 'High Value'])
+        
+        # Per-segment numbers for the report in one pass (observed=False keeps empty segments at 0)
+        seg_stats = rfm.groupby('Segment', observed=False).agg(
+            n=('Monetary', 'size'),
+            recency=('Recency', 'mean'),
+            frequency=('Frequency', 'mean'),
+            monetary_mean=('Monetary', 'mean'),
+            monetary_sum=('Monetary', 'sum')
+        )
+        total_mon = rfm['Monetary'].sum()
+        seg_stats['rev_pct'] = 100 * seg_stats['monetary_sum'] / total_mon
+        seg_stats['cust_pct'] = 100 * seg_stats['n'] / len(rfm)
+        # plain dicts per segment, so the template below just reads numbers
+        seg = seg_stats.to_dict('index')
+        high, med, low = seg['High Value'], seg['Medium Value'], seg['Low Value']
         
         # Generate report
         report = f"""
@@ -268,28 +385,28 @@ class StatisticalAnalysis:
         RESULTS
         ========
         
-        HIGH VALUE Customers ({len(rfm[rfm['Segment'] == 'High Value']):,}):
-        - Recent buyers (avg {rfm[rfm['Segment'] == 'High Value']['Recency'].mean():.0f} days ago)
-        - Frequent buyers (avg {rfm[rfm['Segment'] == 'High Value']['Frequency'].mean():.1f} orders)
-        - High spenders (avg £{rfm[rfm['Segment'] == 'High Value']['Monetary'].mean():.2f})
-        - Total revenue: £{rfm[rfm['Segment'] == 'High Value']['Monetary'].sum():,.2f}
-        - % of total revenue: {100 * rfm[rfm['Segment'] == 'High Value']['Monetary'].sum() / rfm['Monetary'].sum():.1f}%
+        HIGH VALUE Customers ({high['n']:,}):
+        - Recent buyers (avg {high['recency']:.0f} days ago)
+        - Frequent buyers (avg {high['frequency']:.1f} orders)
+        - High spenders (avg £{high['monetary_mean']:.2f})
+        - Total revenue: £{high['monetary_sum']:,.2f}
+        - % of total revenue: {high['rev_pct']:.1f}%
         - What to do: Reward loyalty, offer VIP perks, don't lose them!
         
-        MEDIUM VALUE Customers ({len(rfm[rfm['Segment'] == 'Medium Value']):,}):
+        MEDIUM VALUE Customers ({med['n']:,}):
         - Moderate buyers 
-        - Last purchase: avg {rfm[rfm['Segment'] == 'Medium Value']['Recency'].mean():.0f} days ago
-        - Avg {rfm[rfm['Segment'] == 'Medium Value']['Frequency'].mean():.1f} orders, £{rfm[rfm['Segment'] == 'Medium Value']['Monetary'].mean():.2f} spent
-        - Total revenue: £{rfm[rfm['Segment'] == 'Medium Value']['Monetary'].sum():,.2f}
-        - % of total revenue: {100 * rfm[rfm['Segment'] == 'Medium Value']['Monetary'].sum() / rfm['Monetary'].sum():.1f}%
+        - Last purchase: avg {med['recency']:.0f} days ago
+        - Avg {med['frequency']:.1f} orders, £{med['monetary_mean']:.2f} spent
+        - Total revenue: £{med['monetary_sum']:,.2f}
+        - % of total revenue: {med['rev_pct']:.1f}%
         - What to do: Nurture with occasional offers, encourage more purchases
         
-        LOW VALUE Customers ({len(rfm[rfm['Segment'] == 'Low Value']):,}):
+        LOW VALUE Customers ({low['n']:,}):
         - Infrequent/older purchases or low spend
-        - Last purchase: avg {rfm[rfm['Segment'] == 'Low Value']['Recency'].mean():.0f} days ago
-        - Avg {rfm[rfm['Segment'] == 'Low Value']['Frequency'].mean():.1f} orders, £{rfm[rfm['Segment'] == 'Low Value']['Monetary'].mean():.2f} spent
-        - Total revenue: £{rfm[rfm['Segment'] == 'Low Value']['Monetary'].sum():,.2f}
-        - % of total revenue: {100 * rfm[rfm['Segment'] == 'Low Value']['Monetary'].sum() / rfm['Monetary'].sum():.1f}%
+        - Last purchase: avg {low['recency']:.0f} days ago
+        - Avg {low['frequency']:.1f} orders, £{low['monetary_mean']:.2f} spent
+        - Total revenue: £{low['monetary_sum']:,.2f}
+        - % of total revenue: {low['rev_pct']:.1f}%
         - What to do: Win-back campaign, special offer to re-engage
         
         =============================
@@ -297,14 +414,14 @@ class StatisticalAnalysis:
         =============================
         
         Total customers: {len(rfm):,}
-        - {len(rfm[rfm['Segment'] == 'High Value']):,} ({100*len(rfm[rfm['Segment'] == 'High Value'])/len(rfm):.1f}%) are High Value
-        - {len(rfm[rfm['Segment'] == 'Medium Value']):,} ({100*len(rfm[rfm['Segment'] == 'Medium Value'])/len(rfm):.1f}%) are Medium Value
-        - {len(rfm[rfm['Segment'] == 'Low Value']):,} ({100*len(rfm[rfm['Segment'] == 'Low Value'])/len(rfm):.1f}%) are Low Value
+        - {high['n']:,} ({high['cust_pct']:.1f}%) are High Value
+        - {med['n']:,} ({med['cust_pct']:.1f}%) are Medium Value
+        - {low['n']:,} ({low['cust_pct']:.1f}%) are Low Value
         
         Revenue distribution:
-        - High Value: {100 * rfm[rfm['Segment'] == 'High Value']['Monetary'].sum() / rfm['Monetary'].sum():.1f}%
-        - Medium Value: {100 * rfm[rfm['Segment'] == 'Medium Value']['Monetary'].sum() / rfm['Monetary'].sum():.1f}%
-        - Low Value: {100 * rfm[rfm['Segment'] == 'Low Value']['Monetary'].sum() / rfm['Monetary'].sum():.1f}%
+        - High Value: {high['rev_pct']:.1f}%
+        - Medium Value: {med['rev_pct']:.1f}%
+        - Low Value: {low['rev_pct']:.1f}%
         """
         
         print(report)
@@ -318,7 +435,14 @@ class StatisticalAnalysis:
         """Analyze relationships between numeric variables"""
         logger.info("\n=== CORRELATION ANALYSIS ===")
         
-        corr_matrix = self.df[['Quantity', 'UnitPrice', 'TotalSales']].corr()
+        cols = ['Quantity', 'UnitPrice', 'TotalSales']
+        mat = self.df[cols].to_numpy(dtype=np.float32)
+        if np.isfinite(mat).all():
+            # cleaned data has no NaNs, so one corrcoef call does it (no NaN-aware pairwise loop)
+            corr = np.corrcoef(mat, rowvar=False)
+        else:
+            corr = self.df[cols].corr().to_numpy()
+        corr_matrix = pd.DataFrame(corr, index=cols, columns=cols)
         
         report = f"""
         CORRELATION ANALYSIS
@@ -327,23 +451,23 @@ class StatisticalAnalysis:
         Correlation Matrix:
         
                     Quantity  UnitPrice  TotalSales
-        Quantity        1.00     {corr_matrix.loc['Quantity', 'UnitPrice']:.3f}      {corr_matrix.loc['Quantity', 'TotalSales']:.3f}
-        UnitPrice       {corr_matrix.loc['UnitPrice', 'Quantity']:.3f}      1.00       {corr_matrix.loc['UnitPrice', 'TotalSales']:.3f}
-        TotalSales      {corr_matrix.loc['TotalSales', 'Quantity']:.3f}      {corr_matrix.loc['TotalSales', 'UnitPrice']:.3f}       1.00
+        Quantity        1.00     {corr[0, 1]:.3f}      {corr[0, 2]:.3f}
+        UnitPrice       {corr[1, 0]:.3f}      1.00       {corr[1, 2]:.3f}
+        TotalSales      {corr[2, 0]:.3f}      {corr[2, 1]:.3f}       1.00
         
         Key Findings:
         
-        1. Quantity vs UnitPrice: {corr_matrix.loc['Quantity', 'UnitPrice']:.3f}
+        1. Quantity vs UnitPrice: {corr[0, 1]:.3f}
            What I see: When people buy more units, the unit price is slightly lower
            Why this happens: We offer bulk discounts - bigger orders get better prices
            This makes sense
         
-        2. Quantity vs TotalSales: {corr_matrix.loc['Quantity', 'TotalSales']:.3f}
+        2. Quantity vs TotalSales: {corr[0, 2]:.3f}
            What I see: Strong relationship - more units = higher total revenue
            Why: This is expected - volume directly affects sales
            Validates: Our revenue model depends on selling volume
         
-        3. UnitPrice vs TotalSales: {corr_matrix.loc['UnitPrice', 'TotalSales']:.3f}
+        3. UnitPrice vs TotalSales: {corr[1, 2]:.3f}
            What I see: Higher-priced items also generate higher revenue
            Why: Premium products sell well - good pricing strategy
            Opportunity: Premium products seem to be working
@@ -372,19 +496,20 @@ class StatisticalAnalysis:
         logger.info("\n=== RETURN RATE ANALYSIS ===")
         
         # Overall return rate
+        is_return = pd.Series(self.df['Quantity'].to_numpy() < 0, index=self.df.index)
         total_transactions = len(self.df)
-        return_transactions = (self.df['Quantity'] < 0).sum()
+        return_transactions = int(is_return.sum())
         return_rate = return_transactions / total_transactions
         
-        # By product
-        product_returns = self.df.groupby('Description').apply(
-            lambda x: pd.Series({
-                'total': len(x),
-                'returns': (x['Quantity'] < 0).sum(),
-                'return_rate': 100 * (x['Quantity'] < 0).sum() / len(x)
-            })
+        # By product - size and sum of the return flag per product, no per-group Python calls
+        product_returns = is_return.groupby(self.df['Description'], sort=False, observed=True).agg(
+            total='size', returns='sum'
         )
-        product_returns = product_returns.sort_values('return_rate', ascending=False)
+        product_returns['return_rate'] = 100.0 * product_returns['returns'] / product_returns['total']
+        # ties broken by product name, the order the baseline's sorted groupby gave them
+        product_returns = product_returns.sort_values(['return_rate', 'Description'], ascending=[False, True],
+                                                      kind='stable')
+        high_return_products = (product_returns['return_rate'] > 15).sum()
         
         report = f"""
         RETURN ANALYSIS
@@ -404,19 +529,22 @@ class StatisticalAnalysis:
         (Only products with 10+ orders)
         """
         
+        # one entry per product, joined once at the end instead of growing the string line by line
         top_returns = product_returns[product_returns['total'] >= 10].head(10)
-        for idx, (product, row) in enumerate(top_returns.iterrows(), 1):
-            report += f"\n{idx}. {product[:50]}\n"
-            report += f"   Total Orders: {int(row['total'])}\n"
-            report += f"   Returns: {int(row['returns'])}\n"
-            report += f"   Return Rate: {row['return_rate']:.1f}%\n"
+        parts = [report]
+        for idx, (product, total, returns, rate) in enumerate(
+                top_returns[['total', 'returns', 'return_rate']].itertuples(index=True, name=None), 1):
+            parts.append(f"\n{idx}. {product[:50]}\n"
+                         f"   Total Orders: {int(total)}\n"
+                         f"   Returns: {int(returns)}\n"
+                         f"   Return Rate: {rate:.1f}%\n")
         
-        report += f"""
+        parts.append(f"""
         
         WHAT I NOTICED:
         - Products with return rates >15% seem unusual - might indicate real issues
         - Possible reasons: Quality problems, customer confusion about sizing, unclear product descriptions
-        - Number of products with high return rates: {(product_returns['return_rate'] > 15).sum()} products
+        - Number of products with high return rates: {high_return_products} products
         
         WHAT MIGHT HELP:
         1. Review those high-return products - are they genuinely defective or misdescribed?
@@ -429,7 +557,8 @@ class StatisticalAnalysis:
         - Current return volume: {return_transactions:,} per year
         - Annual cost: £{return_transactions * 3:,} (midpoint estimate)
         - Opportunity: 2% reduction = £{return_transactions * 0.02 * 3:,.0f} annual savings
-        """
+        """)
+        report = ''.join(parts)
         
         print(report)
         self.save_report('return_rate_analysis.txt', report)
@@ -443,18 +572,21 @@ class StatisticalAnalysis:
         logger.info("\n=== GENERATING EXECUTIVE SUMMARY ===")
         
         # Quick calculations
-        total_revenue = self.df['TotalSales'].sum()
-        total_customers = self.df['CustomerID'].nunique()
-        repeat_rate = (self.df.groupby('CustomerID')['InvoiceNo'].count() > 1).sum() / total_customers
-        top_20_revenue = self.df.groupby('CustomerID')['TotalSales'].sum().nlargest(int(total_customers * 0.2)).sum()
+        rev = self._revenue_stats
+        total_revenue = rev['sum']
+        total_customers = self._repeat_stats['total']
+        repeat_rate = self._repeat_stats['repeat_rate']  # same number the repeat-purchase report quotes
+        top_20_revenue = self._customer_ltv_stats['top20_sum']
         top_20_pct = 100 * top_20_revenue / total_revenue
+        total_transactions = len(self.df)
+        generated = pd.Timestamp.now()
         
         report = f"""
         EXECUTIVE SUMMARY - DATA ANALYSIS PROJECT
         ==========================================
         Dataset: Online Retail (Kaggle)
         Period: Dec 2010 - Dec 2011
-        Generated: {pd.Timestamp.now()}
+        Generated: {generated}
         
         ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         KEY METRICS
@@ -462,14 +594,14 @@ class StatisticalAnalysis:
         
         Revenue Metrics:
         ✓ Total Revenue: £{total_revenue:,.0f}
-        ✓ Avg Transaction: £{self.df['TotalSales'].mean():.2f}
-        ✓ Median Transaction: £{self.df['TotalSales'].median():.2f}
-        ✓ Revenue Range: £{self.df['TotalSales'].min():.2f} to £{self.df['TotalSales'].max():.0f}
+        ✓ Avg Transaction: £{rev['mean']:.2f}
+        ✓ Median Transaction: £{rev['median']:.2f}
+        ✓ Revenue Range: £{rev['min']:.2f} to £{rev['max']:.0f}
         
         Customer Metrics:
         ✓ Total Customers: {total_customers:,}
-        ✓ Total Transactions: {len(self.df):,}
-        ✓ Avg Transactions/Customer: {len(self.df) / total_customers:.1f}
+        ✓ Total Transactions: {total_transactions:,}
+        ✓ Avg Transactions/Customer: {total_transactions / total_customers:.1f}
         
         ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
         TOP 3 FINDINGS
@@ -548,17 +680,23 @@ class StatisticalAnalysis:
         self.save_report('EXECUTIVE_SUMMARY.txt', report)
 
 
-def main():
-    """Run all statistical analysis"""
-    analysis = StatisticalAnalysis('data/cleaned_data.csv')
+# Independent analyses - each writes its own report; the executive summary runs after them
+ANALYSES = [
+    'analyze_revenue_distribution',
+    'analyze_customer_value_distribution',
+    'analyze_repeat_purchase_rate',
+    'analyze_rfm',
+    'analyze_correlations',
+    'analyze_return_rates',
+]
+
+def main(df=None, analyses=ANALYSES, processes=None):
+    """Run all statistical analysis - pass df to skip re-reading the cleaned data"""
+    analysis = StatisticalAnalysis('data/cleaned_data.parquet', df=df)
+    # the scalars shared with the executive summary get built before the analyses fork
+    run_analyses(analysis, analyses, processes,
+                 shared=('_revenue_stats', '_customer_ltv_stats', '_repeat_stats'))
     
-    # Run all analyses
-    analysis.analyze_revenue_distribution()
-    analysis.analyze_customer_value_distribution()
-    analysis.analyze_repeat_purchase_rate()
-    analysis.analyze_rfm()
-    analysis.analyze_correlations()
-    analysis.analyze_return_rates()
     analysis.generate_executive_summary()
     
     logger.info("\n✅ Statistical Analysis Complete!")
@@ -0,0 +1,59 @@
+"""
+Analysis Pool
+=============
+
+Runs a list of independent analysis methods side by side on a fork pool.
+Shared by the EDA and statistical analysis steps.
+"""
+
+from contextlib import redirect_stdout
+import io
+import multiprocessing
+import os
+
+# What the forked workers run against - (object, name of a list to collect) - inherited
+# copy-on-write, never pickled
+_job = None
+
+
+def _run_one(name):
+    """Run one analysis in a worker; hand back its printed output and what it added to the list"""
+    target, collect = _job
+    # a worker can run several analyses, so only return the items this one added
+    items = getattr(target, collect) if collect else []
+    already_added = len(items)
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        getattr(target, name)()
+    return buffer.getvalue(), items[already_added:]
+
+
+def run_analyses(target, analyses, processes=None, shared=(), collect=None):
+    """Call target.<name>() for every name in analyses
+
+    Runs on a fork pool when there's more than one analysis and the platform can fork,
+    otherwise one after another. Printed output comes back in the original order.
+    shared: attributes (cached aggregates) built before forking so every worker inherits them
+    collect: name of a list attribute - items the workers append get added to the parent's list
+    """
+    global _job
+    if len(analyses) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        # No fork (Windows) or a single analysis - just run them here
+        for name in analyses:
+            getattr(target, name)()
+        return
+
+    for name in shared:
+        getattr(target, name)
+
+    _job = (target, collect)
+    try:
+        processes = processes or min(os.cpu_count() or 1, len(analyses))
+        with multiprocessing.get_context('fork').Pool(processes) as pool:
+            # imap keeps the original order for the printed output and collected items
+            for output, items in pool.imap(_run_one, analyses):
+                print(output, end='')
+                if collect:
+                    getattr(target, collect).extend(items)
+    finally:
+        _job = None
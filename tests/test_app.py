@@ -0,0 +1,96 @@
+"""Tests for the Flask app (run from the repo root: python -m unittest discover tests)"""
+
+import csv
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import app  # noqa: E402
+
+
+def write_raw_csv(path, rows=200):
+    """Small OnlineRetail-shaped CSV (same columns and date format as the real file)"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['InvoiceNo', 'StockCode', 'Description', 'Quantity', 'InvoiceDate',
+                         'UnitPrice', 'CustomerID', 'Country'])
+        for i in range(rows):
+            writer.writerow([536000 + i // 3, 20000 + i % 7, f'ITEM {i % 7}', 1 + i % 20,
+                             f'{1 + i % 12}/{1 + i % 28}/2011 {8 + i % 10}:{i % 60:02d}',
+                             f'{0.5 + (i * 37 % 200) / 10:.2f}', 12000 + i % 15,
+                             ('United Kingdom', 'France')[i % 2]])
+
+
+def _slow_stage():
+    """Stand-in cleaning stage that never finishes - records its pid first"""
+    with open(os.environ['SLOW_STAGE_PID_FILE'], 'w') as f:
+        f.write(str(os.getpid()))
+    time.sleep(60)
+
+
+class CleanedDataPreviewTest(unittest.TestCase):
+    """Preview of what end_to_end_analysis.py writes to results/cleaned_data.parquet"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(cls.tmp.name, 'data'))
+        write_raw_csv(os.path.join(cls.tmp.name, 'data', 'OnlineRetail.csv'))
+        subprocess.run([sys.executable, os.path.join(REPO_DIR, 'end_to_end_analysis.py')],
+                       cwd=cls.tmp.name, check=True, capture_output=True)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+    
+    def test_dates_look_like_the_csv_preview(self):
+        app.clear_caches()
+        with mock.patch.object(app, 'RESULTS_DIR', os.path.join(self.tmp.name, 'results')):
+            preview = app.app.test_client().get('/api/cleaned-data').get_json()
+        
+        self.assertNotIn('error', preview)
+        columns = preview['columns']
+        for row in preview['preview']:
+            # datetime64 column with times, and a date-object column - no RFC-1123 strings
+            self.assertRegex(row[columns.index('InvoiceDate')], r'^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d$')
+            self.assertRegex(row[columns.index('Date')], r'^\d{4}-\d\d-\d\d$')
+    
+    def test_date_only_timestamps_drop_the_time(self):
+        df = app.format_preview_dates(pd.DataFrame({
+            'Day': pd.to_datetime(['2010-12-01', '2010-12-02']),
+            'At': pd.to_datetime(['2010-12-01 08:26', None]),
+        }))
+        self.assertEqual(df['Day'].tolist(), ['2010-12-01', '2010-12-02'])
+        self.assertEqual(df['At'].iloc[0], '2010-12-01 08:26:00')
+        self.assertTrue(pd.isna(df['At'].iloc[1]))
+
+
+class RunAnalysisTimeoutTest(unittest.TestCase):
+    def test_worker_is_killed_after_timeout(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pid_file = os.path.join(tmp, 'pid')
+            with mock.patch.dict(os.environ, {'SLOW_STAGE_PID_FILE': pid_file}), \
+                    mock.patch.object(app, 'ANALYSIS_TIMEOUT', 2), \
+                    mock.patch.object(app.data_cleaning, 'main', _slow_stage):
+                response = app.app.test_client().post('/api/run-analysis')
+            
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('timeout', response.get_json()['error'])
+            with open(pid_file) as f:
+                pid = int(f.read())
+            # the stage's worker process must be gone, not still running in the background
+            with self.assertRaises(ProcessLookupError):
+                os.kill(pid, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Tests for the EDA step (run from the repo root: python -m unittest discover tests)"""
+
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+exploratory = importlib.import_module('src.02_exploratory_analysis')
+
+
+def make_cleaned_data(rows=500, seed=0):
+    """Small frame with the cleaned-data columns the EDA step reads"""
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(1, 30, rows)
+    price = rng.integers(10, 2000, rows) / 100
+    return pd.DataFrame({
+        'InvoiceNo': (536000 + np.arange(rows) // 3).astype(str),
+        'Description': rng.choice([f'ITEM {i}' for i in range(12)], rows),
+        'Quantity': quantity,
+        'InvoiceDate': pd.Timestamp('2010-12-01') + pd.to_timedelta(rng.integers(0, 360 * 24, rows), unit='h'),
+        'UnitPrice': price,
+        'CustomerID': rng.integers(12000, 12040, rows).astype(str),
+        'Country': rng.choice(['United Kingdom', 'France', 'Germany'], rows),
+        'TotalSales': quantity * price,
+    })
+
+
+class FromStreamTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.df = make_cleaned_data()
+        cls.path = os.path.join(cls.tmp.name, 'cleaned_data.parquet')
+        cls.df.to_parquet(cls.path, index=False)
+        cls.full = exploratory.ExploratoryDataAnalysis(cls.path, verbose=False)
+        # chunks much smaller than the data, so the running totals really get combined
+        cls.streamed = exploratory.ExploratoryDataAnalysis.from_stream(cls.path, chunksize=64, verbose=False)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+    
+    def assert_same_frame(self, streamed, full):
+        pd.testing.assert_frame_equal(streamed.reset_index(drop=True), full.reset_index(drop=True),
+                                      check_dtype=False, check_exact=False)
+        self.assertEqual([str(key) for key in streamed.index], [str(key) for key in full.index])
+    
+    def test_aggregates_match_the_in_memory_ones(self):
+        for name in ('country_agg', 'product_agg', 'customer_agg', 'monthly_agg'):
+            with self.subTest(name):
+                self.assert_same_frame(getattr(self.streamed, name), getattr(self.full, name))
+    
+    def test_summary_numbers_match(self):
+        streamed, full = self.streamed.sales_summary, self.full.sales_summary
+        self.assertEqual(streamed.keys(), full.keys())
+        for key, value in full.items():
+            with self.subTest(key):
+                if isinstance(value, pd.Timestamp):
+                    self.assertEqual(streamed[key], value)
+                else:
+                    self.assertAlmostEqual(streamed[key], value, places=6)
+    
+    def test_median_with_an_even_row_count(self):
+        path = os.path.join(self.tmp.name, 'even.parquet')
+        make_cleaned_data(rows=101).iloc[:100].to_parquet(path, index=False)
+        streamed = exploratory.ExploratoryDataAnalysis.from_stream(path, chunksize=7, verbose=False)
+        self.assertAlmostEqual(streamed.sales_summary['median'], pd.read_parquet(path)['TotalSales'].median())
+    
+    def test_aggregate_analyses_and_report_run_on_a_stream(self):
+        cwd = os.getcwd()
+        os.makedirs(os.path.join(self.tmp.name, 'notebooks', 'visualizations'), exist_ok=True)
+        os.chdir(self.tmp.name)
+        try:
+            eda = exploratory.ExploratoryDataAnalysis.from_stream(self.path, chunksize=64, verbose=False)
+            for name in exploratory.AGGREGATE_ANALYSES:
+                getattr(eda, name)()
+            eda.generate_summary_report()
+            with open(os.path.join('notebooks', 'EDA_SUMMARY_REPORT.txt')) as f:
+                report = f.read()
+        finally:
+            os.chdir(cwd)
+        self.assertIn(f"Total Transactions: {len(self.df):,}", report)
+        self.assertEqual(len(eda.figures_saved), len(exploratory.AGGREGATE_ANALYSES))
+
+
+if __name__ == '__main__':
+    unittest.main()
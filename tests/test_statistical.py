@@ -0,0 +1,53 @@
+"""Tests for the statistical analysis step (run from the repo root: python -m unittest discover tests)"""
+
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+statistical = importlib.import_module('src.03_statistical_analysis')
+
+
+def make_analysis(total_sales):
+    """StatisticalAnalysis over one row per TotalSales value (results/ goes to a temp dir)"""
+    n = len(total_sales)
+    df = pd.DataFrame({
+        'CustomerID': [str(12000 + i % 5) for i in range(n)],
+        'InvoiceNo': [str(536000 + i) for i in range(n)],
+        'InvoiceDate': pd.date_range('2010-12-01', periods=n, freq='h'),
+        'Description': [f'ITEM {i % 3}' for i in range(n)],
+        'Quantity': [1] * n,
+        'UnitPrice': total_sales,
+        'TotalSales': total_sales,
+    })
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            return statistical.StatisticalAnalysis('unused', df=df)
+        finally:
+            os.chdir(cwd)
+
+
+class RevenueModeTest(unittest.TestCase):
+    def assert_mode_matches_pandas(self, total_sales):
+        analysis = make_analysis(total_sales)
+        self.assertEqual(analysis._revenue_stats['mode'], pd.Series(total_sales).mode()[0])
+    
+    def test_values_a_penny_rounding_would_merge(self):
+        # 3 * 1.65 is 4.949999... - a different price from 4.95, and the most common one here
+        self.assert_mode_matches_pandas([4.95, 4.95, 3 * 1.65, 3 * 1.65, 3 * 1.65, 2.55])
+    
+    def test_ties_take_the_smallest_value(self):
+        self.assert_mode_matches_pandas([7.5, 7.5, 1.65, 1.65, 20.0])
+    
+    def test_negative_returns_included(self):
+        self.assert_mode_matches_pandas([-12.5, -12.5, -12.5, 3.0, 3.0, 100.25])
+
+
+if __name__ == '__main__':
+    unittest.main()